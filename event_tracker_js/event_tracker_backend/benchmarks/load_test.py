@@ -0,0 +1,266 @@
+import argparse
+import asyncio
+import csv
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_NAMES = ["Aarav", "Anaya", "Arjun", "Diya", "Isha", "Kabir", "Meera", "Rohan", "Saanvi", "Vivaan"]
+LAST_NAMES = ["Sharma", "Singh", "Nair", "Patel", "Verma", "Mehta", "Reddy", "Gupta", "Kapoor", "Chopra"]
+ROLES = ["Attendee"] * 8 + ["Speaker", "Organiser"]
+CHECKPOINTS = ["registered", "lunch_collected", "kit_collected"]
+PERCENTILES = [50, 95, 99]
+
+
+def generate_csv(rows: int, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["Name", "Email", "Phone", "Role"])
+    for i in range(rows):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        writer.writerow([
+            f"{first} {last}",
+            f"{first.lower()}.{last.lower()}.{i}@example.com",
+            f"+91-{rng.randint(7000000000, 9999999999)}",
+            rng.choice(ROLES)
+        ])
+    return buffer.getvalue().encode()
+
+
+class LatencyRecorder:
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.recording = False
+
+    def record(self, endpoint: str, seconds: float, ok: bool):
+        if not self.recording:
+            return
+        self.samples.setdefault(endpoint, []).append(seconds)
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    async def timed(self, endpoint: str, request):
+        start = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            self.record(endpoint, time.perf_counter() - start, False)
+            return None
+        self.record(endpoint, time.perf_counter() - start, response.is_success)
+        return response
+
+    def summary(self, elapsed: float) -> dict:
+        results = {}
+        for endpoint, samples in sorted(self.samples.items()):
+            samples = sorted(samples)
+            results[endpoint] = {
+                "requests": len(samples),
+                "errors": self.errors.get(endpoint, 0),
+                "throughput_per_second": len(samples) / elapsed,
+                **{f"p{p}_ms": percentile(samples, p) * 1000 for p in PERCENTILES},
+                "max_ms": samples[-1] * 1000
+            }
+        return results
+
+
+def percentile(sorted_samples, p):
+    # nearest rank
+    rank = max(1, -(-len(sorted_samples) * p // 100))
+    return sorted_samples[rank - 1]
+
+
+async def station(client: httpx.AsyncClient, recorder: LatencyRecorder, identifiers, think_time: float, seed: int):
+    # scan a badge, look the attendee up, then mark one checkpoint
+    rng = random.Random(seed)
+    while True:
+        identifier = rng.choice(identifiers)
+        await recorder.timed("GET /attendee/{identifier}", client.get(f"/attendee/{identifier}"))
+        await recorder.timed(
+            "PUT /attendee/{identifier}",
+            client.put(f"/attendee/{identifier}", json={rng.choice(CHECKPOINTS): True})
+        )
+        if think_time:
+            await asyncio.sleep(rng.uniform(0, 2 * think_time))
+
+
+async def dashboard(client: httpx.AsyncClient, recorder: LatencyRecorder, poll_interval: float, seed: int):
+    await asyncio.sleep(random.Random(seed).uniform(0, poll_interval))
+    while True:
+        await recorder.timed("GET /stats", client.get("/stats"))
+        await asyncio.sleep(poll_interval)
+
+
+async def run_load(args) -> dict:
+    recorder = LatencyRecorder()
+    limits = httpx.Limits(max_connections=args.stations + args.dashboards + 1)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        recorder.recording = True
+        upload = await recorder.timed(
+            "POST /upload-csv",
+            client.post("/upload-csv", files={"file": ("load_test.csv", generate_csv(args.attendees, args.seed), "text/csv")})
+        )
+        recorder.recording = False
+        if upload is None or not upload.is_success:
+            raise RuntimeError(f"Seeding through /upload-csv failed: {upload.text if upload is not None else 'no response'}")
+        seed_seconds = recorder.samples["POST /upload-csv"][0]
+        # a reused server may already hold these emails, fall back to whatever is there
+        identifiers = [attendee["identifier"] for attendee in upload.json()["attendees"]]
+        if not identifiers:
+            identifiers = [attendee["identifier"] for attendee in (await client.get("/attendees", params={"limit": args.attendees})).json()]
+        if not identifiers:
+            raise RuntimeError("No attendees to scan")
+
+        tasks = [
+            asyncio.create_task(station(client, recorder, identifiers, args.think_time, args.seed + i))
+            for i in range(args.stations)
+        ] + [
+            asyncio.create_task(dashboard(client, recorder, args.poll_interval, args.seed + args.stations + i))
+            for i in range(args.dashboards)
+        ]
+        try:
+            await asyncio.sleep(args.warmup)
+            recorder.recording = True
+            start = time.perf_counter()
+            await asyncio.sleep(args.duration)
+            recorder.recording = False
+            elapsed = time.perf_counter() - start
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    endpoints = recorder.summary(elapsed)
+    endpoints["POST /upload-csv"] = {
+        "requests": 1, "errors": 0, "seconds": seed_seconds, "attendees_per_second": args.attendees / seed_seconds
+    }
+    return {
+        "seconds": elapsed,
+        "scans_per_second": endpoints.get("PUT /attendee/{identifier}", {}).get("throughput_per_second", 0),
+        "endpoints": endpoints
+    }
+
+
+def start_server(port: int, workdir: str, db_mode: str, materialized_stats: bool):
+    # a fresh database in workdir, the checked-in event_tracker.db is left alone
+    env = dict(os.environ, EVENT_TRACKER_DB_MODE=db_mode)
+    if materialized_stats:
+        env["EVENT_TRACKER_MATERIALIZED_STATS"] = "1"
+    server = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--app-dir", BACKEND_DIR,
+        "--port", str(port),
+        "--log-level", "warning"
+    ], cwd=workdir, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start within 30 seconds")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(run: dict):
+    print(f"{'endpoint':30s} {'requests':>9s} {'errors':>7s} {'req/s':>9s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'max ms':>8s}")
+    for endpoint, result in run["endpoints"].items():
+        if "p50_ms" not in result:
+            continue
+        print(
+            f"{endpoint:30s} {result['requests']:9d} {result['errors']:7d} {result['throughput_per_second']:9.1f} "
+            f"{result['p50_ms']:8.2f} {result['p95_ms']:8.2f} {result['p99_ms']:8.2f} {result['max_ms']:8.2f}"
+        )
+    seed = run["endpoints"]["POST /upload-csv"]
+    print(f"Seeding: {seed['seconds']:.2f} s ({seed['attendees_per_second']:.0f} attendees/s)")
+    print(f"Scans: {run['scans_per_second']:.1f}/s over {run['seconds']:.1f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate check-in stations and dashboards against the Event Tracker API")
+    parser.add_argument("--attendees", type=int, default=5000, help="attendees seeded through /upload-csv")
+    parser.add_argument("--stations", type=int, default=10, help="concurrent scan -> GET -> PUT loops")
+    parser.add_argument("--dashboards", type=int, default=5, help="concurrent /stats pollers")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="seconds between a dashboard's /stats calls")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean seconds a station waits between scans")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds of load before measuring")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="run against an already running API instead of starting one")
+    parser.add_argument("--port", type=int, default=8123, help="port for the uvicorn this script starts")
+    parser.add_argument("--db-mode", choices=["async", "sync"], help="database mode of the started server, async by default")
+    parser.add_argument("--materialized-stats", action="store_true", help="start the server with materialized stats")
+    parser.add_argument("--output", help="results file, defaults to benchmarks/results/load_test_<timestamp>.json")
+    args = parser.parse_args()
+    if args.url:
+        # only the server this script starts can be configured, an external one is recorded as unknown
+        if args.db_mode or args.materialized_stats:
+            parser.error("--db-mode and --materialized-stats configure the started server and can't be used with --url")
+        args.materialized_stats = None
+    else:
+        args.db_mode = args.db_mode or "async"
+
+    server = None
+    with tempfile.TemporaryDirectory() as workdir:
+        if not args.url:
+            server = start_server(args.port, workdir, args.db_mode, args.materialized_stats)
+            args.url = f"http://127.0.0.1:{args.port}"
+        try:
+            print(f"Seeding {args.attendees} attendees, then {args.stations} stations and {args.dashboards} dashboards for {args.duration:g} s...")
+            run = asyncio.run(run_load(args))
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+
+    print_report(run)
+
+    timestamp = datetime.datetime.now()
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "results", f"load_test_{timestamp.strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "revision": git_revision(),
+            "timestamp": timestamp.isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {
+                name: getattr(args, name) for name in (
+                    "attendees", "stations", "dashboards", "poll_interval", "think_time", "duration",
+                    "warmup", "url", "db_mode", "materialized_stats"
+                )
+            },
+            "run": run
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
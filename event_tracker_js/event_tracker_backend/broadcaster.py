@@ -0,0 +1,86 @@
+import asyncio
+
+
+class StatsBroadcaster:
+    # writers call notify() after they commit; at most once per min_interval the broadcaster reads the
+    # stats once and fans the totals and the change since the last push out to every subscriber, so the
+    # database sees one stats read per interval however many screens are listening
+
+    def __init__(self, read_stats, min_interval=1.0, buffer_size=16):
+        self.read_stats = read_stats
+        self.min_interval = min_interval
+        self.buffer_size = buffer_size
+        self.subscribers = set()
+        self.loop = None
+        self.latest = None
+        self.pending = False
+        self.last_push = 0.0
+        self.refresh_lock = None
+
+    def notify(self):
+        # safe to call from any thread; a no-op while nobody is subscribed
+        loop = self.loop
+        if loop is None or not self.subscribers or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self.schedule()
+        else:
+            loop.call_soon_threadsafe(self.schedule)
+
+    def schedule(self):
+        if self.pending:
+            return
+        self.pending = True
+        delay = max(0.0, self.last_push + self.min_interval - self.loop.time())
+        self.loop.call_later(delay, lambda: self.loop.create_task(self.push()))
+
+    async def refresh(self):
+        async with self.refresh_lock:
+            stats = await self.read_stats()
+            previous, self.latest = self.latest, stats
+            if previous is None:
+                return stats, None
+            return stats, {name: value - previous.get(name, 0) for name, value in stats.items()}
+
+    async def push(self):
+        # cleared before reading so a commit landing during the read schedules another push
+        self.pending = False
+        self.last_push = self.loop.time()
+        stats, delta = await self.refresh()
+        if delta is None or not any(delta.values()):
+            return
+        message = {"stats": stats, "delta": delta}
+        for subscriber in self.subscribers:
+            if subscriber.full():
+                # a slow client skips ahead, every message carries the full totals anyway
+                subscriber.get_nowait()
+            subscriber.put_nowait(message)
+
+    async def subscribe(self, idle_timeout=None):
+        # yields each message, or None after idle_timeout seconds without one
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.pending = False
+            self.refresh_lock = asyncio.Lock()
+            self.subscribers = set()
+        subscriber = asyncio.Queue(maxsize=self.buffer_size)
+        self.subscribers.add(subscriber)
+        try:
+            if len(self.subscribers) == 1 or self.latest is None:
+                # nothing was tracking commits while nobody listened
+                stats, _ = await self.refresh()
+            else:
+                stats = self.latest
+            yield {"stats": stats, "delta": None}
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber.get(), idle_timeout)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self.subscribers.discard(subscriber)
@@ -1,20 +1,235 @@
-from sqlalchemy import create_engine
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./event_tracker.db"
+ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./event_tracker.db"
+
+# "async" serves reads and updates on the event loop through aiosqlite, "sync" keeps the blocking
+# driver and runs them on the threadpool
+DB_MODE = os.environ.get("EVENT_TRACKER_DB_MODE", "async").lower()
+if DB_MODE not in ("async", "sync"):
+    raise ValueError(f"EVENT_TRACKER_DB_MODE must be async or sync, not {DB_MODE!r}")
+ASYNC_DB = DB_MODE == "async"
+
+# keep a one-row counters table in step with every write so /stats is a primary-key read
+MATERIALIZED_STATS = os.environ.get("EVENT_TRACKER_MATERIALIZED_STATS", "").lower() in ("1", "true", "yes")
+
+# group commit: the writer waits at most this long after the first queued write before committing
+WRITE_GROUP_MAX_LATENCY = float(os.environ.get("EVENT_TRACKER_WRITE_GROUP_MAX_LATENCY", "0.005"))
+WRITE_GROUP_MAX_SIZE = int(os.environ.get("EVENT_TRACKER_WRITE_GROUP_MAX_SIZE", "64"))
+READ_POOL_SIZE = int(os.environ.get("EVENT_TRACKER_READ_POOL_SIZE", "8"))
+# how long a writer waits for another writer's transaction, a bulk upload say, to commit
+WRITE_BUSY_TIMEOUT = float(os.environ.get("EVENT_TRACKER_WRITE_BUSY_TIMEOUT", "30"))
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False, "timeout": WRITE_BUSY_TIMEOUT}
+)
+read_engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}, pool_size=READ_POOL_SIZE
 )
+
+
+@event.listens_for(engine, "connect")
+def configure_write_connection(dbapi_connection, connection_record):
+    # WAL lets the readers carry on while the writer commits, NORMAL syncs at checkpoints only.
+    # pysqlite's own transaction handling breaks SAVEPOINT, so BEGIN is emitted below instead
+    dbapi_connection.isolation_level = None
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
+@event.listens_for(engine, "begin")
+def begin_write_transaction(connection):
+    # IMMEDIATE takes the write lock up front: a deferred BEGIN that has read before another writer
+    # committed can't be upgraded in WAL mode and fails with "database is locked" without waiting
+    connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+@event.listens_for(read_engine, "connect")
+def configure_read_connection(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+if ASYNC_DB:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, connect_args={"timeout": WRITE_BUSY_TIMEOUT})
+    async_read_engine = create_async_engine(ASYNC_DATABASE_URL, pool_size=READ_POOL_SIZE)
+    event.listen(async_engine.sync_engine, "connect", configure_write_connection)
+    event.listen(async_engine.sync_engine, "begin", begin_write_transaction)
+    event.listen(async_read_engine.sync_engine, "connect", configure_read_connection)
+
+    AsyncSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=async_engine)
+    AsyncReadSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=async_read_engine)
 
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
+def read_sync(query):
+    with ReadSessionLocal() as db:
+        return query(db)
+
+
+async def run_read(query):
+    # query(db) gets a plain Session either way; in async mode it runs on the event loop with
+    # aiosqlite doing the I/O, otherwise on a worker thread
+    if ASYNC_DB:
+        async with AsyncReadSessionLocal() as db:
+            return await db.run_sync(query)
+    return await asyncio.to_thread(read_sync, query)
+
+
+async def run_write(write):
+    if ASYNC_DB:
+        return await async_write_queue.execute(write)
+    return await asyncio.wrap_future(write_queue.submit(write))
+
+
+def commit_group(db, group):
+    # each write gets its own savepoint so a failing one only undoes itself, then the group
+    # shares a single commit (and fsync); returns (future, result, error) per write
+    results = []
     try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+        for write, future in group:
+            savepoint = db.begin_nested()
+            try:
+                result = write(db)
+                savepoint.commit()
+                results.append((future, result, None))
+            except Exception as e:
+                savepoint.rollback()
+                results.append((future, None, e))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        # nothing in the group was committed, so every caller gets the error
+        errors = {id(future): error for future, result, error in results if error is not None}
+        results = [(future, None, errors.get(id(future), e)) for write, future in group]
+    return results
+
+
+class WriteQueue:
+    # every queued write runs on one thread and session, grouped by commit_group
+
+    def __init__(self, session_factory, max_latency=WRITE_GROUP_MAX_LATENCY, max_size=WRITE_GROUP_MAX_SIZE):
+        self.session_factory = session_factory
+        self.max_latency = max_latency
+        self.max_size = max_size
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def submit(self, write):
+        # write(db) runs on the writer thread and must return plain data, not ORM objects
+        future = Future()
+        self.queue.put((write, future))
+        if self.thread is None:
+            with self.lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self.run, name="write-queue", daemon=True)
+                    self.thread.start()
+        return future
+
+    def execute(self, write):
+        return self.submit(write).result()
+
+    def next_group(self):
+        group = [self.queue.get()]
+        deadline = time.monotonic() + self.max_latency
+        while len(group) < self.max_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                group.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return group
+
+    def run(self):
+        while True:
+            group = [(write, future) for write, future in self.next_group() if future.set_running_or_notify_cancel()]
+            db = self.session_factory()
+            try:
+                results = commit_group(db, group)
+            finally:
+                db.close()
+
+            for future, result, error in results:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+
+class AsyncWriteQueue:
+    # same group commit as WriteQueue, run by a task on the event loop over an AsyncSession
+
+    def __init__(self, session_factory, max_latency=WRITE_GROUP_MAX_LATENCY, max_size=WRITE_GROUP_MAX_SIZE):
+        self.session_factory = session_factory
+        self.max_latency = max_latency
+        self.max_size = max_size
+        self.loop = None
+        self.queue = None
+        self.task = None
+
+    async def execute(self, write):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            # the queue and its task belong to one event loop
+            self.loop = loop
+            self.queue = asyncio.Queue()
+            self.task = loop.create_task(self.run())
+        future = loop.create_future()
+        self.queue.put_nowait((write, future))
+        return await future
+
+    async def next_group(self):
+        group = [await self.queue.get()]
+        deadline = time.monotonic() + self.max_latency
+        while len(group) < self.max_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                group.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return group
+
+    async def run(self):
+        while True:
+            group = [(write, future) for write, future in await self.next_group() if not future.done()]
+            try:
+                async with self.session_factory() as db:
+                    results = await db.run_sync(commit_group, group)
+            except Exception as e:
+                results = [(future, None, e) for write, future in group]
+
+            for future, result, error in results:
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+
+write_queue = WriteQueue(SessionLocal)
+if ASYNC_DB:
+    async_write_queue = AsyncWriteQueue(AsyncSessionLocal)
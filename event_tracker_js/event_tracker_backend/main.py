@@ -1,25 +1,136 @@
 import csv
 import io
+import itertools
+import multiprocessing
 import random
 import string
-import qrcode
 from datetime import datetime
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Query
+from fastapi import FastAPI, BackgroundTasks, HTTPException, UploadFile, File, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Float, Integer, case, func, insert, or_, select, text, tuple_, update
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Union
 import os
 import base64
+import hashlib
+import json
+import uuid
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
 
-from database import get_db, engine
+import orjson
+
+from database import engine, SessionLocal, ReadSessionLocal, MATERIALIZED_STATS, read_sync, run_read, run_write
 import models
 import schemas
+from broadcaster import StatsBroadcaster
+from metrics import MetricsMiddleware, RequestMetrics
+from qrcodes import QRCodeCache, badge_file_name, role_colors, stream_qr_zip
+
+
+def create_tables():
+    models.Base.metadata.create_all(bind=engine)
+    # create_all skips indexes of tables that already exist
+    for index in models.Attendee.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+
+def setup_attendee_search():
+    # trigram FTS5 index over the searchable columns, kept in sync by triggers; False when this
+    # SQLite build lacks FTS5 or the trigram tokenizer (3.34+), search then falls back to LIKE
+    statements = [
+        """CREATE TRIGGER IF NOT EXISTS attendees_fts_ai AFTER INSERT ON attendees BEGIN
+            INSERT INTO attendees_fts (rowid, name, email, identifier) VALUES (new.id, new.name, new.email, new.identifier);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS attendees_fts_ad AFTER DELETE ON attendees BEGIN
+            INSERT INTO attendees_fts (attendees_fts, rowid, name, email, identifier) VALUES ('delete', old.id, old.name, old.email, old.identifier);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS attendees_fts_au AFTER UPDATE OF name, email, identifier ON attendees BEGIN
+            INSERT INTO attendees_fts (attendees_fts, rowid, name, email, identifier) VALUES ('delete', old.id, old.name, old.email, old.identifier);
+            INSERT INTO attendees_fts (rowid, name, email, identifier) VALUES (new.id, new.name, new.email, new.identifier);
+        END""",
+    ]
+    try:
+        with engine.begin() as connection:
+            exists = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'attendees_fts'")
+            ).first()
+            if not exists:
+                connection.execute(text(
+                    "CREATE VIRTUAL TABLE attendees_fts USING fts5("
+                    "name, email, identifier, content='attendees', content_rowid='id', tokenize='trigram')"
+                ))
+                connection.execute(text("INSERT INTO attendees_fts (attendees_fts) VALUES ('rebuild')"))
+            for statement in statements:
+                connection.execute(text(statement))
+        return True
+    except OperationalError:
+        return False
+
+
+# set by setup_attendee_search at startup
+FTS_ENABLED = False
+FTS_MIN_QUERY_LENGTH = 3
+
+
+def fail_interrupted_import_jobs(db: Session):
+    # import jobs run as background tasks of this process, so any still queued or running at startup
+    # were cut off by a restart; failed jobs accept the same file again, which resumes the import
+    db.execute(
+        update(models.ImportJob)
+        .where(models.ImportJob.status.in_(("queued", "running")))
+        .values(status="failed", error="Interrupted by a server restart", finished_at=datetime.now())
+    )
 
 
-models.Base.metadata.create_all(bind=engine)
-
-app = FastAPI(title="Event Tracker API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # startup writes live here rather than at import time: spawned and forkserver children
+    # re-import this module (as __mp_main__ under `python main.py`) and must not touch the database
+    global FTS_ENABLED
+    await run_in_threadpool(create_tables)
+    FTS_ENABLED = await run_in_threadpool(setup_attendee_search)
+    if MATERIALIZED_STATS:
+        await run_in_threadpool(refresh_stats_counters)
+    await run_write(fail_interrupted_import_jobs)
+    yield
+
+
+app = FastAPI(title="Event Tracker API", lifespan=lifespan)
+
+UPLOAD_DIR = "./uploads"
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+QR_CACHE_CONTROL = "public, max-age=86400"
+BATCH_UPDATE_MAX_OPERATIONS = 5000
+BATCH_UPDATE_CHUNK_SIZE = 500
+QR_EXPORT_WORKERS = int(os.environ.get("EVENT_TRACKER_QR_EXPORT_WORKERS", os.cpu_count() or 1))
+QR_EXPORT_BATCH_SIZE = 500
+REPORT_CHUNK_SIZE = 1000
+CHECKPOINT_FIELDS = ("registered", "lunch_collected", "kit_collected")
+# in schemas.AttendeeResponse field order; list endpoints fetch these as plain rows and encode them
+# with orjson instead of validating every row through the response model
+ATTENDEE_RESPONSE_COLUMNS = (
+    models.Attendee.name,
+    models.Attendee.email,
+    models.Attendee.phone,
+    models.Attendee.role,
+    models.Attendee.id,
+    models.Attendee.identifier,
+    models.Attendee.registered,
+    models.Attendee.lunch_collected,
+    models.Attendee.kit_collected,
+    models.Attendee.registration_time,
+)
+ATTENDEE_RESPONSE_FIELDS = tuple(column.key for column in ATTENDEE_RESPONSE_COLUMNS)
+# live stats subscribers get at most one push per interval however fast commits arrive
+STATS_PUSH_INTERVAL = float(os.environ.get("EVENT_TRACKER_STATS_PUSH_INTERVAL", "1.0"))
+STATS_STREAM_KEEPALIVE = 15
 
+qr_cache = QRCodeCache()
+qr_export_pool = None
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,36 +140,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+request_metrics = RequestMetrics()
+app.add_middleware(MetricsMiddleware, metrics=request_metrics)
+
 
 def generate_identifier(length=8):
     chars = string.ascii_uppercase + string.digits
     return ''.join(random.choice(chars) for _ in range(length))
 
 
-def generate_qr_code(data, role="Attendee"):
-    
-    role_colors = {
-        "organiser": ("white", "darkblue"),
-        "speaker": ("black", "red"),
-        "attendee": ("black", "yellow")  
-    }
+def attendee_rows_to_dicts(rows):
+    return [dict(zip(ATTENDEE_RESPONSE_FIELDS, row)) for row in rows]
 
-    fill_color, back_color = role_colors.get(role.lower(), ("black", "white"))
 
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(data)
-    qr.make(fit=True)
+def json_response(content):
+    return Response(content=orjson.dumps(content), media_type="application/json")
 
-    img = qr.make_image(fill_color=fill_color, back_color=back_color)
 
-    buffer = io.BytesIO()
-    img.save(buffer)
-    img_str = base64.b64encode(buffer.getvalue()).decode()
+def generate_qr_code(data, role="Attendee"):
+    png = qr_cache.get(data, role)
+    img_str = base64.b64encode(png).decode()
     return f"data:image/png;base64,{img_str}"
 
 
@@ -66,104 +167,397 @@ def generate_qr_code(data, role="Attendee"):
 def read_root():
     return {"message": "Welcome to Event Tracker API"}
 
-@app.post("/upload-csv", response_model=schemas.AttendeeList)
-async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    
-    if not file.filename.endswith('.csv'):
-        raise HTTPException(status_code=400, detail="File must be a CSV")
-    
+
+@app.get("/metrics")
+async def get_metrics():
+    return Response(content=request_metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+STATS_COUNTERS_ID = 1
+
+
+def compute_stats(db: Session):
+    total, registered, lunch_collected, kit_collected = db.query(
+        func.count(models.Attendee.id),
+        func.coalesce(func.sum(case((models.Attendee.registered == True, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((models.Attendee.lunch_collected == True, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((models.Attendee.kit_collected == True, 1), else_=0)), 0)
+    ).one()
+
+    return {
+        "total": total,
+        "registered": registered,
+        "lunch_collected": lunch_collected,
+        "kit_collected": kit_collected
+    }
+
+
+def refresh_stats_counters():
+    # rebuilt from the attendees table at startup in case writes happened while it was switched off
+    db = SessionLocal()
     try:
-        contents = await file.read()
-        decoded_content = contents.decode('utf-8')
-        csv_reader = csv.DictReader(io.StringIO(decoded_content))
-        
-        attendees = []
-        skipped = 0
-        for row in csv_reader:
-            name = row.get('Name', '').strip()
-            email = row.get('Email', '').strip().lower()
+        db.merge(models.StatsCounters(id=STATS_COUNTERS_ID, **compute_stats(db)))
+        db.commit()
+    finally:
+        db.close()
+
+
+def adjust_stats_counters(db: Session, **deltas):
+    # runs inside the caller's transaction so the counters commit or roll back with the change itself
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not MATERIALIZED_STATS or not deltas:
+        return
+    counters = models.StatsCounters.__table__.c
+    db.execute(
+        models.StatsCounters.__table__.update()
+        .where(counters.id == STATS_COUNTERS_ID)
+        .values({name: counters[name] + delta for name, delta in deltas.items()})
+    )
+
+
+def read_attendee_keys(db: Session):
+    emails = set()
+    identifiers = set()
+    for email, identifier in db.query(models.Attendee.email, models.Attendee.identifier):
+        emails.add(email)
+        identifiers.add(identifier)
+    return emails, identifiers
+
+
+def insert_attendee_batch(db: Session, pending, collect: bool):
+    # runs as one writer item. Another writer may have added some of these emails or identifiers since
+    # the keys were read, so those emails come back as taken and clashing identifiers are drawn again
+    emails = {values["email"] for values in pending}
+    identifiers = {values["identifier"] for values in pending}
+    taken = set()
+    clashing = set()
+    for email, identifier in db.execute(
+        select(models.Attendee.email, models.Attendee.identifier)
+        .where(or_(models.Attendee.email.in_(emails), models.Attendee.identifier.in_(identifiers)))
+    ):
+        if email in emails:
+            taken.add(email)
+        if identifier in identifiers:
+            clashing.add(identifier)
+    pending = [values for values in pending if values["email"] not in taken]
+    while clashing:
+        for values in pending:
+            if values["identifier"] in clashing:
+                values["identifier"] = generate_identifier()
+        identifiers = [values["identifier"] for values in pending]
+        clashing = set(db.scalars(select(models.Attendee.identifier).where(models.Attendee.identifier.in_(identifiers))))
+
+    attendees = []
+    if pending:
+        if collect:
+            attendees = attendee_rows_to_dicts(
+                db.execute(insert(models.Attendee).returning(*ATTENDEE_RESPONSE_COLUMNS), pending)
+            )
+        else:
+            db.execute(insert(models.Attendee), pending)
+        adjust_stats_counters(db, total=len(pending))
+    return attendees, len(pending), taken
+
+
+async def ingest_attendee_rows(rows, batch_size: int = 500, collect: bool = True, on_batch=None, atomic: bool = False):
+    # one read for every existing email and identifier, dedupe and identifier assignment happen in
+    # memory and each batch is one batched executemany insert. import jobs send every batch to the
+    # single writer on its own, so check-ins queue behind a batch rather than behind the whole file;
+    # atomic sends all of them as one write, which commits or rolls back as a unit.
+    # on_batch(db, total_processed, added, skipped) runs in the same write, import jobs record progress there.
+    # reading the keys and parsing each batch happen on a worker thread, rows may come straight off a file
+    existing_emails, used_identifiers = await run_in_threadpool(read_sync, read_attendee_keys)
+
+    attendees = []
+    rejected = []
+    pending = []
+    lines = {}
+    batches = []
+    total_processed = 0
+    added = 0
+
+    def record(inserted, count, taken):
+        nonlocal added
+        attendees.extend(inserted)
+        added += count
+        rejected.extend(
+            {"row": lines[email], "email": email, "reason": "Email already registered"} for email in sorted(taken, key=lines.get)
+        )
+
+    async def flush():
+        if not pending and not on_batch:
+            return
+        batch = pending[:]
+        pending.clear()
+        if atomic:
+            batches.append(batch)
+            return
+        processed = total_processed
+        skipped = len(rejected)
+
+        def write(db):
+            inserted, count, taken = insert_attendee_batch(db, batch, collect)
+            if on_batch:
+                on_batch(db, processed, added + count, skipped + len(taken))
+            return inserted, count, taken
+
+        record(*await run_write(write))
+        stats_broadcaster.notify()
+        lines.clear()
+
+    def parse_batch():
+        nonlocal total_processed
+        count = 0
+        for line, row in itertools.islice(rows, batch_size):
+            count += 1
+            total_processed += 1
+            name = (row.get('Name') or '').strip()
+            email = (row.get('Email') or '').strip().lower()
             phone = row.get('Phone', '').strip() if row.get('Phone') else None
-            role = row.get('Role', 'Attendee').strip()
+            role = (row.get('Role') or 'Attendee').strip()
 
             if not name or not email:
+                rejected.append({"row": line, "email": email or None, "reason": "Missing name or email"})
                 continue
 
-            # Check for exact match
-            existing_attendee = db.query(models.Attendee).filter(
-                models.Attendee.email == email
-            ).first()
-
-            if existing_attendee:
-                skipped += 1
+            if email in existing_emails:
+                rejected.append({"row": line, "email": email, "reason": "Email already registered"})
                 continue
+            existing_emails.add(email)
 
             identifier = generate_identifier()
-            while db.query(models.Attendee).filter(
-                models.Attendee.identifier == identifier
-            ).first():
+            while identifier in used_identifiers:
                 identifier = generate_identifier()
+            used_identifiers.add(identifier)
+
+            lines[email] = line
+            pending.append({
+                "name": name,
+                "email": email,
+                "phone": phone,
+                "role": role,
+                "identifier": identifier,
+                "registered": False,
+                "lunch_collected": False,
+                "kit_collected": False
+            })
+        return count
+
+    while True:
+        count = await run_in_threadpool(parse_batch)
+        await flush()
+        if count < batch_size:
+            break
+
+    if batches:
+        results = await run_write(lambda db: [insert_attendee_batch(db, batch, collect) for batch in batches])
+        stats_broadcaster.notify()
+        for result in results:
+            record(*result)
 
-            attendee = models.Attendee(
-                name=name,
-                email=email,
-                phone=phone,
-                role=role,
-                identifier=identifier,
-                registered=False,
-                lunch_collected=False,
-                kit_collected=False
-            )
+    return {
+        "attendees": attendees,
+        "total_processed": total_processed,
+        "added": added,
+        "skipped": len(rejected),
+        "rejected": rejected
+    }
 
-            db.add(attendee)
-            db.flush()
-            attendees.append(attendee)
-            
-            db.commit()
 
+@app.post("/upload-csv", response_model=schemas.CSVUploadResponse)
+async def upload_csv(file: UploadFile = File(...)):
+    
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="File must be a CSV")
+    
+    try:
+        contents = await file.read()
+        decoded_content = await run_in_threadpool(contents.decode, 'utf-8')
+        csv_reader = csv.DictReader(io.StringIO(decoded_content))
         
-        return {
-            "attendees": attendees,
-            "total_processed": len(attendees) + skipped,
-            "added": len(attendees),
-            "skipped": skipped
-        }
+        # one write for the whole file, a failure partway leaves none of its rows behind
+        result = await ingest_attendee_rows(((csv_reader.line_num, row) for row in csv_reader), atomic=True)
+        return json_response(result)
     
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=f"Error processing CSV: {str(e)}")
 
-@app.get("/attendees", response_model=List[schemas.AttendeeResponse])
-def get_attendees(
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100,
-    search: Optional[str] = None
-):
-    query = db.query(models.Attendee)
+def update_import_job(db: Session, job_id: str, **values):
+    db.execute(update(models.ImportJob).where(models.ImportJob.id == job_id).values(**values))
+
+
+async def run_import_job(job_id: str, path: str):
+    # every status and progress update goes through the single writer along with the rows themselves
+    try:
+        await run_write(lambda db: update_import_job(db, job_id, status="running"))
+
+        def on_batch(db, total_processed, added, skipped):
+            update_import_job(db, job_id, rows_processed=total_processed, added=added, skipped=skipped)
+
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            csv_reader = csv.DictReader(f)
+            await ingest_attendee_rows(((csv_reader.line_num, row) for row in csv_reader), collect=False, on_batch=on_batch)
+
+        await run_write(lambda db: update_import_job(db, job_id, status="completed", finished_at=datetime.now()))
+    except Exception as e:
+        await run_write(lambda db: update_import_job(db, job_id, status="failed", error=str(e), finished_at=datetime.now()))
+
+
+def queue_import_job(db: Session, sha256: str, filename: str, path: str):
+    # the duplicate check happens in the same write that queues the job, so of two identical
+    # uploads arriving together only one starts an import and the other gets duplicate=True
+    job = db.query(models.ImportJob).filter(models.ImportJob.sha256 == sha256).first()
+    if job and job.status != "failed":
+        # byte-identical upload, report the job that already handled it
+        response = schemas.ImportJobResponse.model_validate(job, from_attributes=True)
+        response.duplicate = True
+        return response
+    if job:
+        job.status = "queued"
+        job.rows_processed = job.added = job.skipped = 0
+        job.error = None
+        job.finished_at = None
+    else:
+        job = models.ImportJob(id=uuid.uuid4().hex, sha256=sha256, filename=filename, path=path, status="queued")
+        db.add(job)
+    db.flush()
+    db.refresh(job)
+    return schemas.ImportJobResponse.model_validate(job, from_attributes=True)
+
+
+@app.post("/imports", response_model=schemas.ImportJobResponse, status_code=202)
+async def create_import(response: Response, background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+
+    if not file.filename.endswith('.csv'):
+        raise HTTPException(status_code=400, detail="File must be a CSV")
+
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    tmp_path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4().hex}.part")
+    with open(tmp_path, "wb") as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            f.write(chunk)
+    sha256 = digest.hexdigest()
+
+    path = os.path.join(UPLOAD_DIR, f"{sha256}.csv")
+    job = await run_write(lambda db: queue_import_job(db, sha256, file.filename, path))
+    if job.duplicate:
+        os.remove(tmp_path)
+        response.status_code = 200
+        return job
+
+    os.replace(tmp_path, path)
+    background_tasks.add_task(run_import_job, job.id, path)
+    return job
+
+@app.get("/imports", response_model=List[schemas.ImportJobResponse])
+async def get_imports(limit: int = 20):
+    return await run_read(
+        lambda db: db.query(models.ImportJob).order_by(models.ImportJob.created_at.desc()).limit(limit).all()
+    )
+
+@app.get("/imports/{job_id}", response_model=schemas.ImportJobResponse)
+async def get_import(job_id: str):
+    job = await run_read(lambda db: db.get(models.ImportJob, job_id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+CURSOR_SORT_KEYS = {
+    "id": models.Attendee.id,
+    "name": models.Attendee.name,
+    "registration_time": models.Attendee.registration_time,
+}
+
+
+def encode_cursor(sort, attendee):
+    value = getattr(attendee, sort)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort, value, attendee.id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        sort, value, last_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if sort == "registration_time" and value is not None:
+            value = datetime.fromisoformat(value)
+        return sort, value, int(last_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def after_cursor(column, value, last_id):
+    # rows strictly after (value, id) in (column, id) order, where SQLite sorts NULLs first
+    if value is None:
+        return ((column.is_(None)) & (models.Attendee.id > last_id)) | column.isnot(None)
+    return tuple_(column, models.Attendee.id) > tuple_(value, last_id)
+
+
+def query_attendees(db: Session, skip: int, limit: int, search: Optional[str], cursor: Optional[str], sort: str):
+    # passing cursor (empty for the first page) switches to keyset pagination, which seeks on
+    # (sort key, id) through an index and returns {attendees, next_cursor} instead of a plain list
+    query = db.query(*ATTENDEE_RESPONSE_COLUMNS)
+    matches = None
     
-    if search:
+    if search and FTS_ENABLED and len(search) >= FTS_MIN_QUERY_LENGTH:
+        # quoted as one phrase so the trigram tokenizer does a substring match
+        matches = text(
+            "SELECT rowid AS id, rank FROM attendees_fts WHERE attendees_fts MATCH :query"
+        ).bindparams(query='"' + search.replace('"', '""') + '"').columns(id=Integer, rank=Float).subquery()
+        query = query.join(matches, matches.c.id == models.Attendee.id)
+    elif search:
         query = query.filter(
             (models.Attendee.name.contains(search)) |
             (models.Attendee.email.contains(search)) |
             (models.Attendee.identifier.contains(search))
         )
     
-    attendees = query.offset(skip).limit(limit).all()
-    return attendees
+    if cursor is None:
+        if matches is not None:
+            # best matches first
+            query = query.order_by(matches.c.rank, models.Attendee.id)
+        return attendee_rows_to_dicts(query.offset(skip).limit(limit))
+    
+    if sort not in CURSOR_SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(CURSOR_SORT_KEYS)}")
+    column = CURSOR_SORT_KEYS[sort]
+    
+    if cursor:
+        cursor_sort, value, last_id = decode_cursor(cursor)
+        if cursor_sort != sort:
+            raise HTTPException(status_code=400, detail="Cursor was issued for a different sort")
+        query = query.filter(after_cursor(column, value, last_id))
+    
+    order = [models.Attendee.id] if sort == "id" else [column, models.Attendee.id]
+    attendees = query.order_by(*order).limit(limit + 1).all()
+    next_cursor = encode_cursor(sort, attendees[limit - 1]) if len(attendees) > limit else None
+    return {"attendees": attendee_rows_to_dicts(attendees[:limit]), "next_cursor": next_cursor}
+
+@app.get("/attendees", response_model=Union[List[schemas.AttendeeResponse], schemas.AttendeePage])
+async def get_attendees(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1),
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    sort: str = "id"
+):
+    return json_response(await run_read(lambda db: query_attendees(db, skip, limit, search, cursor, sort)))
 
-@app.get("/attendee/{identifier}", response_model=schemas.AttendeeResponse)
-def get_attendee(identifier: str, db: Session = Depends(get_db)):
+def find_attendee(db: Session, identifier: str):
     attendee = db.query(models.Attendee).filter(models.Attendee.identifier == identifier).first()
     if not attendee:
         raise HTTPException(status_code=404, detail="Attendee not found")
     return attendee
 
-@app.put("/attendee/{identifier}", response_model=schemas.AttendeeResponse)
-def update_attendee(identifier: str, attendee_update: schemas.AttendeeUpdate, db: Session = Depends(get_db)):
-    db_attendee = db.query(models.Attendee).filter(models.Attendee.identifier == identifier).first()
-    if not db_attendee:
-        raise HTTPException(status_code=404, detail="Attendee not found")
-    
+@app.get("/attendee/{identifier}", response_model=schemas.AttendeeResponse)
+async def get_attendee(identifier: str):
+    return await run_read(lambda db: find_attendee(db, identifier))
+
+def apply_attendee_update(db: Session, identifier: str, attendee_update: schemas.AttendeeUpdate):
+    db_attendee = find_attendee(db, identifier)
+    before = (bool(db_attendee.registered), bool(db_attendee.lunch_collected), bool(db_attendee.kit_collected))
 
     if attendee_update.registered is not None:
         if attendee_update.registered and not db_attendee.registered:
@@ -176,17 +570,93 @@ def update_attendee(identifier: str, attendee_update: schemas.AttendeeUpdate, db
     if attendee_update.kit_collected is not None:
         db_attendee.kit_collected = attendee_update.kit_collected
     
-    db.commit()
-    db.refresh(db_attendee)
-    return db_attendee
+    adjust_stats_counters(
+        db,
+        registered=bool(db_attendee.registered) - before[0],
+        lunch_collected=bool(db_attendee.lunch_collected) - before[1],
+        kit_collected=bool(db_attendee.kit_collected) - before[2]
+    )
+    db.flush()
+    return db_attendee.to_dict()
+
+@app.put("/attendee/{identifier}", response_model=schemas.AttendeeResponse)
+async def update_attendee(identifier: str, attendee_update: schemas.AttendeeUpdate):
+    # goes through the single writer, which returns once the group holding this update is committed
+    attendee = await run_write(lambda db: apply_attendee_update(db, identifier, attendee_update))
+    stats_broadcaster.notify()
+    return attendee
+
+def apply_batch_update(db: Session, operations: List[schemas.AttendeeBatchOperation]):
+    # one SELECT per chunk for the current flags, then at most one UPDATE per (field, value) per
+    # chunk; operations apply in order, so a badge scanned twice in a batch is already_set the second time
+    identifiers = list({operation.identifier for operation in operations})
+    original = {}
+    for start in range(0, len(identifiers), BATCH_UPDATE_CHUNK_SIZE):
+        rows = db.execute(
+            select(models.Attendee.id, models.Attendee.identifier, *(getattr(models.Attendee, field) for field in CHECKPOINT_FIELDS))
+            .where(models.Attendee.identifier.in_(identifiers[start:start + BATCH_UPDATE_CHUNK_SIZE]))
+        )
+        for row in rows:
+            original[row.identifier] = (row.id, {field: bool(getattr(row, field)) for field in CHECKPOINT_FIELDS})
+
+    current = {identifier: dict(flags) for identifier, (_, flags) in original.items()}
+    results = []
+    for operation in operations:
+        flags = current.get(operation.identifier)
+        if flags is None:
+            results.append({"identifier": operation.identifier, "status": "not_found"})
+            continue
+        changed = False
+        for field in CHECKPOINT_FIELDS:
+            value = getattr(operation, field)
+            if value is not None and value != flags[field]:
+                flags[field] = value
+                changed = True
+        results.append({"identifier": operation.identifier, "status": "updated" if changed else "already_set"})
+
+    targets = {}
+    deltas = dict.fromkeys(CHECKPOINT_FIELDS, 0)
+    for identifier, (attendee_id, before) in original.items():
+        after = current[identifier]
+        for field in CHECKPOINT_FIELDS:
+            if after[field] != before[field]:
+                targets.setdefault((field, after[field]), []).append(attendee_id)
+                deltas[field] += after[field] - before[field]
+
+    now = datetime.now()
+    for (field, value), ids in targets.items():
+        values = {field: value}
+        if field == "registered" and value:
+            values["registration_time"] = now
+        for start in range(0, len(ids), BATCH_UPDATE_CHUNK_SIZE):
+            db.execute(
+                update(models.Attendee)
+                .where(models.Attendee.id.in_(ids[start:start + BATCH_UPDATE_CHUNK_SIZE]))
+                .values(values)
+                .execution_options(synchronize_session=False)
+            )
+
+    adjust_stats_counters(db, **deltas)
+    counts = {status: 0 for status in ("updated", "not_found", "already_set")}
+    for result in results:
+        counts[result["status"]] += 1
+    return {**counts, "results": results}
+
+@app.post("/attendees/batch-update", response_model=schemas.BatchUpdateResponse)
+async def batch_update_attendees(batch: schemas.AttendeeBatchUpdate):
+    # lets stations flush buffered scans in one request and one transaction
+    if len(batch.operations) > BATCH_UPDATE_MAX_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_UPDATE_MAX_OPERATIONS} operations per batch")
+    result = await run_write(lambda db: apply_batch_update(db, batch.operations))
+    if result["updated"]:
+        stats_broadcaster.notify()
+    return result
 
 @app.get("/qrcode/{identifier}")
-def get_qrcode(identifier: str, db: Session = Depends(get_db)):
-    attendee = db.query(models.Attendee).filter(models.Attendee.identifier == identifier).first()
-    if not attendee:
-        raise HTTPException(status_code=404, detail="Attendee not found")
-    
-    qr_code = generate_qr_code(identifier, attendee.role)
+async def get_qrcode(identifier: str):
+    attendee = await run_read(lambda db: find_attendee(db, identifier))
+    # rendering a cache miss is CPU work, keep it off the event loop
+    qr_code = await run_in_threadpool(generate_qr_code, identifier, attendee.role)
     return {
         "identifier": identifier,
         "name": attendee.name,
@@ -195,19 +665,153 @@ def get_qrcode(identifier: str, db: Session = Depends(get_db)):
     }
 
 
-@app.get("/stats", response_model=schemas.StatsResponse)
-def get_stats(db: Session = Depends(get_db)):
-    total = db.query(models.Attendee).count()
-    registered = db.query(models.Attendee).filter(models.Attendee.registered == True).count()
-    lunch_collected = db.query(models.Attendee).filter(models.Attendee.lunch_collected == True).count()
-    kit_collected = db.query(models.Attendee).filter(models.Attendee.kit_collected == True).count()
+@app.get("/qrcode/{identifier}/image")
+async def get_qrcode_image(identifier: str, request: Request):
+    attendee = await run_read(lambda db: find_attendee(db, identifier))
+    headers = {"ETag": qr_cache.etag(identifier, role_colors(attendee.role)), "Cache-Control": QR_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    png = await run_in_threadpool(qr_cache.get, identifier, attendee.role)
+    return Response(content=png, media_type="image/png", headers=headers)
+
+
+def get_qr_export_pool():
+    global qr_export_pool
+    if qr_export_pool is None:
+        # forked workers would inherit the writer thread, aiosqlite's threads and whatever locks they
+        # held at that moment; the forkserver is a clean process that only ever imports the renderer.
+        # platforms without forkserver (Windows) get spawn, which is just as clean
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(["qrcodes"])
+        else:
+            context = multiprocessing.get_context("spawn")
+        qr_export_pool = ProcessPoolExecutor(max_workers=QR_EXPORT_WORKERS, mp_context=context)
+    return qr_export_pool
+
+
+def filter_attendees(query, role: Optional[str] = None, registered: Optional[bool] = None,
+                     lunch_collected: Optional[bool] = None, kit_collected: Optional[bool] = None):
+    if role:
+        query = query.filter(func.lower(models.Attendee.role) == role.lower())
+    for column, value in (
+        (models.Attendee.registered, registered),
+        (models.Attendee.lunch_collected, lunch_collected),
+        (models.Attendee.kit_collected, kit_collected),
+    ):
+        if value is not None:
+            query = query.filter(column == value)
+    return query
+
+
+def iter_export_attendees(role: Optional[str], registered: Optional[bool]):
+    # keyset batches, each in its own short read transaction so a long export doesn't pin the WAL
+    last_id = 0
+    while True:
+        with ReadSessionLocal() as db:
+            query = db.query(models.Attendee.id, models.Attendee.identifier, models.Attendee.name, models.Attendee.role)
+            query = filter_attendees(query, role=role, registered=registered)
+            rows = query.filter(models.Attendee.id > last_id).order_by(models.Attendee.id).limit(QR_EXPORT_BATCH_SIZE).all()
+        if not rows:
+            return
+        for row in rows:
+            yield row.identifier, row.role, badge_file_name(row.identifier, row.name)
+        last_id = rows[-1].id
+
+
+@app.get("/qrcodes/export")
+def export_qrcodes(role: Optional[str] = None, registered: Optional[bool] = None):
+    archive = stream_qr_zip(iter_export_attendees(role, registered), get_qr_export_pool(), max_pending=QR_EXPORT_WORKERS * 4)
+    return StreamingResponse(
+        archive,
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="qrcodes.zip"'}
+    )
+
+
+def iter_attendee_report(**filters):
+    # one read transaction for a consistent snapshot; rows come off the cursor REPORT_CHUNK_SIZE at a
+    # time and each chunk goes out as soon as it is formatted
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([
+        "Name", "Email", "Phone", "Role", "Identifier", "Registered",
+        "Registration Time", "Lunch Collected", "Kit Collected"
+    ])
+    yield buffer.getvalue().encode()
+
+    with ReadSessionLocal() as db:
+        query = filter_attendees(db.query(*ATTENDEE_RESPONSE_COLUMNS), **filters).order_by(models.Attendee.id)
+        rows = db.execute(query.statement.execution_options(yield_per=REPORT_CHUNK_SIZE))
+        for chunk in rows.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(
+                (
+                    row.name,
+                    row.email,
+                    row.phone,
+                    row.role,
+                    row.identifier,
+                    "Yes" if row.registered else "No",
+                    row.registration_time.isoformat() if row.registration_time else "",
+                    "Yes" if row.lunch_collected else "No",
+                    "Yes" if row.kit_collected else "No",
+                )
+                for row in chunk
+            )
+            yield buffer.getvalue().encode()
+
+
+@app.get("/reports/attendees.csv")
+def export_attendee_report(
+    role: Optional[str] = None,
+    registered: Optional[bool] = None,
+    lunch_collected: Optional[bool] = None,
+    kit_collected: Optional[bool] = None
+):
+    filename = f"event_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    return StreamingResponse(
+        iter_attendee_report(role=role, registered=registered, lunch_collected=lunch_collected, kit_collected=kit_collected),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+def read_stats(db: Session):
+    if MATERIALIZED_STATS:
+        counters = db.get(models.StatsCounters, STATS_COUNTERS_ID)
+        return {
+            "total": counters.total,
+            "registered": counters.registered,
+            "lunch_collected": counters.lunch_collected,
+            "kit_collected": counters.kit_collected
+        }
     
-    return {
-        "total": total,
-        "registered": registered,
-        "lunch_collected": lunch_collected,
-        "kit_collected": kit_collected
-    }
+    return compute_stats(db)
+
+@app.get("/stats", response_model=schemas.StatsResponse)
+async def get_stats():
+    return await run_read(read_stats)
+
+stats_broadcaster = StatsBroadcaster(lambda: run_read(read_stats), STATS_PUSH_INTERVAL)
+
+async def stats_events():
+    # the first event carries the current totals, later ones also the delta since the previous event
+    async for message in stats_broadcaster.subscribe(idle_timeout=STATS_STREAM_KEEPALIVE):
+        if message is None:
+            yield ": keepalive\n\n"
+        else:
+            yield f"event: stats\ndata: {json.dumps(message, separators=(',', ':'))}\n\n"
+
+@app.get("/stats/stream")
+async def stream_stats():
+    return StreamingResponse(
+        stats_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 if __name__ == "__main__":
     import uvicorn
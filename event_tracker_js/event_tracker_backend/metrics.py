@@ -0,0 +1,102 @@
+import time
+from bisect import bisect_left
+
+# seconds; upper bounds of the latency histogram buckets, +Inf is implied
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class RouteStats:
+    __slots__ = ("bucket_counts", "count", "total_seconds", "errors", "statuses")
+
+    def __init__(self, bucket_count):
+        self.bucket_counts = [0] * (bucket_count + 1)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.errors = 0
+        self.statuses = {}
+
+
+class RequestMetrics:
+    # latency histogram, request count by status and error (5xx or unhandled exception) count per
+    # (method, route template). Only touched from the event loop, so no locking; with several
+    # worker processes each one exposes its own numbers
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.routes = {}
+
+    def observe(self, method, route, status, seconds):
+        stats = self.routes.get((method, route))
+        if stats is None:
+            stats = self.routes[(method, route)] = RouteStats(len(self.buckets))
+        stats.bucket_counts[bisect_left(self.buckets, seconds)] += 1
+        stats.count += 1
+        stats.total_seconds += seconds
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        if status >= 500:
+            stats.errors += 1
+
+    def render(self):
+        # Prometheus text exposition format 0.0.4
+        requests = [
+            "# HELP http_requests_total Requests handled, by route and status code.",
+            "# TYPE http_requests_total counter",
+        ]
+        errors = [
+            "# HELP http_request_errors_total Requests that ended in a 5xx or an unhandled exception.",
+            "# TYPE http_request_errors_total counter",
+        ]
+        durations = [
+            "# HELP http_request_duration_seconds Time from receiving a request to sending the last body byte.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), stats in sorted(self.routes.items()):
+            labels = f'method="{escape_label(method)}",route="{escape_label(route)}"'
+            for status, count in sorted(stats.statuses.items()):
+                requests.append(f'http_requests_total{{{labels},status="{status}"}} {count}')
+            errors.append(f"http_request_errors_total{{{labels}}} {stats.errors}")
+            cumulative = 0
+            for bound, count in zip(self.buckets, stats.bucket_counts):
+                cumulative += count
+                durations.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            durations.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+            durations.append(f"http_request_duration_seconds_sum{{{labels}}} {stats.total_seconds}")
+            durations.append(f"http_request_duration_seconds_count{{{labels}}} {stats.count}")
+        return "\n".join(requests + errors + durations) + "\n"
+
+
+class MetricsMiddleware:
+    # plain ASGI rather than BaseHTTPMiddleware: no extra task per request and streaming bodies pass
+    # straight through. Requests are labelled with the matched route's path template so identifiers
+    # don't blow up the series count; anything the router didn't match is "unmatched"
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception:
+            status = 500
+            raise
+        finally:
+            route = getattr(scope.get("route"), "path", "unmatched")
+            self.metrics.observe(scope["method"], route, status, time.perf_counter() - start)
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime
+from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, Index
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql import func
 
@@ -17,6 +17,11 @@ class Attendee(Base):
     lunch_collected = Column(Boolean, default=False)
     kit_collected = Column(Boolean, default=False)
     registration_time = Column(DateTime, nullable=True)
+
+    # keyset pagination seeks on (sort key, id), id is the rowid so every index already ends with it
+    __table_args__ = (
+        Index("ix_attendees_registration_time", "registration_time"),
+    )
     
     def to_dict(self):
         return {
@@ -30,4 +35,30 @@ class Attendee(Base):
             "lunch_collected": self.lunch_collected,
             "kit_collected": self.kit_collected,
             "registration_time": self.registration_time.isoformat() if self.registration_time else None
-        }
\ No newline at end of file
+        }
+
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(String, primary_key=True)
+    sha256 = Column(String, unique=True, index=True)
+    filename = Column(String)
+    path = Column(String)
+    status = Column(String, default="queued")
+    rows_processed = Column(Integer, default=0)
+    added = Column(Integer, default=0)
+    skipped = Column(Integer, default=0)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), index=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class StatsCounters(Base):
+    __tablename__ = "stats_counters"
+
+    id = Column(Integer, primary_key=True)
+    total = Column(Integer, default=0, nullable=False)
+    registered = Column(Integer, default=0, nullable=False)
+    lunch_collected = Column(Integer, default=0, nullable=False)
+    kit_collected = Column(Integer, default=0, nullable=False)
\ No newline at end of file
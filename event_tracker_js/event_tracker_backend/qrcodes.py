@@ -0,0 +1,143 @@
+import io
+import os
+import re
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import qrcode
+
+ROLE_COLORS = {
+    "organiser": ("white", "darkblue"),
+    "speaker": ("black", "red"),
+    "attendee": ("black", "yellow")
+}
+DEFAULT_COLORS = ("black", "white")
+
+# bump when the rendering below changes so cached files and browser copies are not reused
+RENDER_VERSION = 1
+
+
+def role_colors(role="Attendee"):
+    return ROLE_COLORS.get((role or "").lower(), DEFAULT_COLORS)
+
+
+def render_qr_png(data, colors=DEFAULT_COLORS):
+    fill_color, back_color = colors
+
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    img = qr.make_image(fill_color=fill_color, back_color=back_color)
+
+    buffer = io.BytesIO()
+    img.save(buffer)
+    return buffer.getvalue()
+
+
+class QRCodeCache:
+    # PNGs keyed by (identifier, colours): a small in-memory LRU in front of a directory of rendered files
+
+    def __init__(self, cache_dir="./qr_cache", max_entries=1024):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def etag(self, identifier, colors):
+        return f'"{identifier}-{colors[0]}-{colors[1]}-v{RENDER_VERSION}"'
+
+    def file_path(self, identifier, colors):
+        name = re.sub(r"[^A-Za-z0-9_-]", "_", f"{identifier}_{colors[0]}_{colors[1]}_v{RENDER_VERSION}")
+        return os.path.join(self.cache_dir, f"{name}.png")
+
+    def get(self, identifier, role="Attendee"):
+        colors = role_colors(role)
+        key = (identifier, colors)
+
+        with self.lock:
+            png = self.entries.get(key)
+            if png is not None:
+                self.entries.move_to_end(key)
+                return png
+
+        path = self.file_path(identifier, colors)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                png = f.read()
+        else:
+            png = render_qr_png(identifier, colors)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(png)
+            os.replace(tmp_path, path)
+
+        with self.lock:
+            self.entries[key] = png
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return png
+
+
+def badge_file_name(identifier, name):
+    return re.sub(r"[^A-Za-z0-9_-]", "_", f"{name}_{identifier}") + ".png"
+
+
+class ZipChunks:
+    # write-only file object for zipfile; it is not seekable, so zipfile streams each entry with a
+    # data descriptor and drain() hands back whatever was written since the last call
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def stream_qr_zip(attendees, executor, max_pending=32):
+    # attendees yields (identifier, role, file name); PNGs render on the executor and go into the
+    # archive as they finish, with at most max_pending renders in flight, so memory stays flat
+    output = ZipChunks()
+    pending = {}
+    date_time = time.localtime()[:6]
+
+    def add(done):
+        for future in done:
+            # PNGs are already deflated, store them as is
+            archive.writestr(zipfile.ZipInfo(pending.pop(future), date_time), future.result())
+
+    try:
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_STORED) as archive:
+            for identifier, role, file_name in attendees:
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    add(done)
+                    yield output.drain()
+                pending[executor.submit(render_qr_png, identifier, role_colors(role))] = file_name
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                add(done)
+                yield output.drain()
+        yield output.drain()
+    finally:
+        for future in pending:
+            future.cancel()
@@ -5,7 +5,7 @@ from datetime import datetime
 class AttendeeBase(BaseModel):
     name: str
     email: str
-    phone: str
+    phone: Optional[str] = None
     role: str
     
 
@@ -28,11 +28,57 @@ class AttendeeUpdate(BaseModel):
     lunch_collected: Optional[bool] = None
     kit_collected: Optional[bool] = None
 
+class AttendeeBatchOperation(AttendeeUpdate):
+    identifier: str
+
+class AttendeeBatchUpdate(BaseModel):
+    operations: List[AttendeeBatchOperation]
+
+class BatchUpdateOutcome(BaseModel):
+    identifier: str
+    status: str
+
+class BatchUpdateResponse(BaseModel):
+    updated: int
+    not_found: int
+    already_set: int
+    results: List[BatchUpdateOutcome]
+
 class AttendeeList(BaseModel):
     attendees: List[AttendeeResponse]
 
+class AttendeePage(AttendeeList):
+    next_cursor: Optional[str] = None
+
+class RowRejection(BaseModel):
+    row: int
+    email: Optional[str] = None
+    reason: str
+
+class CSVUploadResponse(AttendeeList):
+    total_processed: int
+    added: int
+    skipped: int
+    rejected: List[RowRejection] = []
+
 class StatsResponse(BaseModel):
     total: int
     registered: int
     lunch_collected: int
-    kit_collected: int
\ No newline at end of file
+    kit_collected: int
+
+class ImportJobResponse(BaseModel):
+    id: str
+    filename: str
+    sha256: str
+    status: str
+    rows_processed: int
+    added: int
+    skipped: int
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    duplicate: bool = False
+
+    class Config:
+        orm_mode = True
\ No newline at end of file
@@ -39,6 +39,31 @@ export const uploadCSV = async (file) => {
   return response.json();
 };
 
+// Start a background import job, the upload is processed after the response
+export const startImport = async (file) => {
+  const formData = new FormData();
+  formData.append("file", file);
+  
+  const response = await fetch(`${API_URL}/imports`, {
+    method: "POST",
+    body: formData,
+  });
+  
+  if (!response.ok) {
+    throw new Error("Failed to upload CSV");
+  }
+  return response.json();
+};
+
+// Get progress of an import job
+export const getImport = async (jobId) => {
+  const response = await fetch(`${API_URL}/imports/${jobId}`);
+  if (!response.ok) {
+    throw new Error("Failed to fetch import progress");
+  }
+  return response.json();
+};
+
 // Update attendee status
 export const updateAttendee = async (identifier, updates) => {
   const response = await fetch(`${API_URL}/attendee/${identifier}`, {
@@ -55,6 +80,22 @@ export const updateAttendee = async (identifier, updates) => {
   return response.json();
 };
 
+// operations: [{ identifier, registered, lunch_collected, kit_collected }], e.g. scans buffered offline
+export const batchUpdateAttendees = async (operations) => {
+  const response = await fetch(`${API_URL}/attendees/batch-update`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({ operations }),
+  });
+  
+  if (!response.ok) {
+    throw new Error("Failed to apply batch update");
+  }
+  return response.json();
+};
+
 // Get QR code for an attendee
 export const getQRCode = async (identifier) => {
   const response = await fetch(`${API_URL}/qrcode/${identifier}`);
@@ -64,6 +105,26 @@ export const getQRCode = async (identifier) => {
   return response.json();
 };
 
+// URL of the raw QR code PNG, served with ETag/Cache-Control so the browser can reuse it
+export const getQRCodeImageUrl = (identifier) => `${API_URL}/qrcode/${encodeURIComponent(identifier)}/image`;
+
+// ZIP of badge PNGs, optionally filtered by role and registered status
+export const getQRCodeExportUrl = ({ role, registered } = {}) => {
+  const params = new URLSearchParams();
+  if (role) params.append("role", role);
+  if (registered !== undefined) params.append("registered", registered);
+  return `${API_URL}/qrcodes/export?${params}`;
+};
+
+// streamed CSV report, filters: role, registered, lunch_collected, kit_collected
+export const getAttendeeReportUrl = (filters = {}) => {
+  const params = new URLSearchParams();
+  Object.entries(filters).forEach(([key, value]) => {
+    if (value !== undefined && value !== "") params.append(key, value);
+  });
+  return `${API_URL}/reports/attendees.csv?${params}`;
+};
+
 // Get event stats
 export const getStats = async () => {
   const response = await fetch(`${API_URL}/stats`);
@@ -71,4 +132,12 @@ export const getStats = async () => {
     throw new Error("Failed to fetch stats");
   }
   return response.json();
+};
+
+// pushes { stats, delta } on connect and whenever attendees change; returns a function that closes the stream
+export const subscribeToStats = (onStats, onError) => {
+  const source = new EventSource(`${API_URL}/stats/stream`);
+  source.addEventListener("stats", (event) => onStats(JSON.parse(event.data).stats));
+  if (onError) source.onerror = onError;
+  return () => source.close();
 };
\ No newline at end of file
@@ -1,5 +1,7 @@
 import { useState } from 'react';
-import { uploadCSV } from '../api';
+import { startImport, getImport } from '../api';
+
+const IMPORT_POLL_INTERVAL = 1000;
 
 function CSVUpload({ navigateTo }) {
   const [file, setFile] = useState(null);
@@ -7,6 +9,7 @@ function CSVUpload({ navigateTo }) {
   const [error, setError] = useState(null);
   const [uploadSuccess, setUploadSuccess] = useState(false);
   const [attendeesAdded, setAttendeesAdded] = useState(0);
+  const [progress, setProgress] = useState(null);
 
   const handleFileChange = (e) => {
     const selectedFile = e.target.files[0];
@@ -31,14 +34,23 @@ function CSVUpload({ navigateTo }) {
     setError(null);
     
     try {
-      const response = await uploadCSV(file);
+      let job = await startImport(file);
+      while (job.status === "queued" || job.status === "running") {
+        setProgress(job);
+        await new Promise((resolve) => setTimeout(resolve, IMPORT_POLL_INTERVAL));
+        job = await getImport(job.id);
+      }
+      if (job.status === "failed") {
+        throw new Error(job.error);
+      }
       setUploadSuccess(true);
-      setAttendeesAdded(response.attendees.length);
+      setAttendeesAdded(job.added);
     } catch (error) {
       console.error("Error uploading CSV:", error);
       setError("Failed to upload CSV file. Please try again.");
     } finally {
       setUploading(false);
+      setProgress(null);
     }
   };
 
@@ -50,7 +62,7 @@ function CSVUpload({ navigateTo }) {
         <div className="upload-success">
           <div className="success-message">
             <h3>Upload Successful!</h3>
-            <p>Attendees were added to the system.</p>
+            <p>{attendeesAdded} attendees were added to the system.</p>
           </div>
           <div className="success-actions">
             <button onClick={() => navigateTo('attendees')}>View Attendees</button>
@@ -86,6 +98,11 @@ function CSVUpload({ navigateTo }) {
             </div>
             
             {error && <p className="error-message">{error}</p>}
+            {progress && (
+              <p className="upload-progress">
+                Processed {progress.rows_processed} rows: {progress.added} added, {progress.skipped} skipped
+              </p>
+            )}
           </div>
           
           <button
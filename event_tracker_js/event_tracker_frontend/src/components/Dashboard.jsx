@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { getStats } from '../api';
+import { subscribeToStats } from '../api';
 
 function Dashboard({ navigateTo }) {
   const [stats, setStats] = useState({
@@ -9,26 +9,32 @@ function Dashboard({ navigateTo }) {
     kit_collected: 0,
   });
   const [loading, setLoading] = useState(true);
+  const [error, setError] = useState(null);
 
   useEffect(() => {
-    const fetchStats = async () => {
-      try {
-        const data = await getStats();
+    const unsubscribe = subscribeToStats(
+      (data) => {
         setStats(data);
-      } catch (error) {
-        console.error("Error fetching stats:", error);
-      } finally {
         setLoading(false);
+        setError(null);
+      },
+      (error) => {
+        // EventSource reconnects by itself, the next stats event clears this
+        console.error("Error streaming stats:", error);
+        setLoading(false);
+        setError("Live stats are unavailable. Retrying...");
       }
-    };
+    );
 
-    fetchStats();
+    return unsubscribe;
   }, []);
 
   return (
     <div className="dashboard">
       <h2>Event Dashboard</h2>
       
+      {error && <p className="error-message">{error}</p>}
+
       {loading ? (
         <p>Loading stats...</p>
       ) : (
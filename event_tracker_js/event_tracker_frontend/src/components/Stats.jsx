@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { getStats } from '../api';
+import { subscribeToStats } from '../api';
 
 function Stats({ navigateTo }) {
   const [stats, setStats] = useState({
@@ -9,20 +9,24 @@ function Stats({ navigateTo }) {
     kit_collected: 0,
   });
   const [loading, setLoading] = useState(true);
+  const [error, setError] = useState(null);
 
   useEffect(() => {
-    const fetchStats = async () => {
-      try {
-        const data = await getStats();
+    const unsubscribe = subscribeToStats(
+      (data) => {
         setStats(data);
-      } catch (error) {
-        console.error("Error fetching stats:", error);
-      } finally {
         setLoading(false);
+        setError(null);
+      },
+      (error) => {
+        // EventSource reconnects by itself, the next stats event clears this
+        console.error("Error streaming stats:", error);
+        setLoading(false);
+        setError("Live statistics are unavailable. Retrying...");
       }
-    };
+    );
 
-    fetchStats();
+    return unsubscribe;
   }, []);
 
   // Calculate percentages
@@ -39,6 +43,8 @@ function Stats({ navigateTo }) {
     <div className="stats-page">
       <h2>Event Statistics</h2>
       
+      {error && <p className="error-message">{error}</p>}
+
       {loading ? (
         <p>Loading statistics...</p>
       ) : (
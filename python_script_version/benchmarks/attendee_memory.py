@@ -0,0 +1,79 @@
+import argparse
+import datetime
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_tracker import Attendee
+
+
+class LegacyAttendee:
+    # the attendee layout before __slots__ and lunch bitmasks, kept here only to compare against
+    
+    def __init__(self, name: str, email: str, phone: str = "", role: str = "Attendee", unique_id: str = None):
+        self.name = name
+        self.email = email
+        self.phone = phone
+        self.role = role
+        self.unique_id = unique_id
+        self.check_in_status = False
+        self.lunch_collected = set()
+        self.kit_collected = False
+        self.registration_time = None
+    
+    def check_in(self):
+        self.check_in_status = True
+        self.registration_time = datetime.datetime.now()
+    
+    def collect_lunch(self, date: str):
+        self.lunch_collected.add(date)
+
+
+def build_attendees(cls, count: int, lunch_days: list) -> list:
+    roles = ["Attendee", "Speaker", "Organizer"]
+    attendees = []
+    for i in range(count):
+        # role strings are built per row the way csv.DictReader hands them over
+        attendee = cls(
+            name=f"Attendee {i}",
+            email=f"attendee{i}@example.com",
+            phone=f"+91-{9000000000 + i}",
+            role=roles[i % len(roles)].encode().decode(),
+            unique_id=f"{i:08x}-0000-4000-8000-000000000000"
+        )
+        attendee.check_in()
+        for date in lunch_days:
+            attendee.collect_lunch(date)
+        attendees.append(attendee)
+    return attendees
+
+
+def measure(cls, count: int, lunch_days: list) -> int:
+    tracemalloc.start()
+    attendees = build_attendees(cls, count, lunch_days)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del attendees
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare memory use of the compact and legacy Attendee layouts")
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--lunch-days", type=int, default=2)
+    args = parser.parse_args()
+    
+    lunch_days = [f"2025-05-{day:02d}" for day in range(11, 11 + args.lunch_days)]
+    legacy = measure(LegacyAttendee, args.count, lunch_days)
+    compact = measure(Attendee, args.count, lunch_days)
+    
+    print(f"{args.count} attendees, {args.lunch_days} lunch days")
+    print(f"  legacy:  {legacy / 1024 / 1024:8.1f} MiB ({legacy / args.count:.0f} bytes/attendee)")
+    print(f"  compact: {compact / 1024 / 1024:8.1f} MiB ({compact / args.count:.0f} bytes/attendee)")
+    print(f"  saved:   {(1 - compact / legacy) * 100:8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import argparse
+import csv
+import datetime
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPT_DIR)
+
+from event_tracker import STORAGE_BACKENDS, EventManager, QRCodeGenerator, UUIDGenerator
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+FIRST_NAMES = ["Aarav", "Anaya", "Arjun", "Diya", "Isha", "Kabir", "Meera", "Rohan", "Saanvi", "Vivaan"]
+LAST_NAMES = ["Sharma", "Singh", "Nair", "Patel", "Verma", "Mehta", "Reddy", "Gupta", "Kapoor", "Chopra"]
+ROLES = ["Attendee"] * 8 + ["Speaker", "Organizer"]
+
+
+def generate_csv(path: str, rows: int, seed: int = 0):
+    rng = random.Random(seed)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Name", "Email", "Phone", "Role"])
+        for i in range(rows):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            writer.writerow([
+                f"{first} {last}",
+                f"{first.lower()}.{last.lower()}.{i}@example.com",
+                f"+91-{rng.randint(7000000000, 9999999999)}",
+                rng.choice(ROLES)
+            ])
+
+
+def timed(results: dict, name: str, func, calls: int = 1):
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    elapsed = time.perf_counter() - start
+    results[name] = {"calls": calls, "total_seconds": elapsed, "mean_seconds": elapsed / calls}
+
+
+def make_data_store(storage: str, snapshot_format: str):
+    if storage == "sqlite":
+        return STORAGE_BACKENDS[storage]()
+    return STORAGE_BACKENDS[storage](snapshot_format=snapshot_format)
+
+
+def run_size(rows: int, storage: str, snapshot_format: str, id_generator: str, operations: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_file = os.path.join(workdir, "attendees.csv")
+        generate_csv(csv_file, rows)
+        os.chdir(workdir)
+
+        generator = QRCodeGenerator() if id_generator == "qr" else UUIDGenerator()
+        event_manager = EventManager(id_generator=generator, data_store=make_data_store(storage, snapshot_format))
+
+        timed(results, "import_attendees_from_csv", lambda i: event_manager.import_attendees_from_csv(csv_file))
+        event_manager.data_store.backups.wait()
+
+        rng = random.Random(1)
+        unique_ids = rng.sample(list(event_manager.attendees), min(operations, rows))
+        queries = [event_manager.attendees[uid].name.split()[1][:4] for uid in unique_ids]
+
+        timed(results, "check_in_attendee", lambda i: event_manager.check_in_attendee(unique_ids[i]), len(unique_ids))
+        timed(results, "collect_lunch", lambda i: event_manager.collect_lunch(unique_ids[i], "2025-05-11"), len(unique_ids))
+        # the index builds on a background thread when an event opens, searches before that scan
+        event_manager.search_index.wait()
+        timed(results, "search_attendees", lambda i: event_manager.search_attendees(queries[i]), len(queries))
+        timed(results, "get_stats", lambda i: event_manager.get_stats(), len(unique_ids))
+        timed(results, "export_report", lambda i: event_manager.export_report("benchmark_report.csv"))
+
+        if hasattr(event_manager.data_store, "wait_for_compaction"):
+            event_manager.data_store.wait_for_compaction()
+        data_store = make_data_store(storage, snapshot_format)
+        timed(results, "DataStore.load_attendees", lambda i: data_store.load_attendees())
+
+    return {
+        "rows": rows,
+        "operations": results,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=SCRIPT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time EventManager core operations on synthetic events")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    # defaults to what the CLI and GUI ship with, a journaled event over a binary snapshot
+    parser.add_argument("--storage", choices=sorted(STORAGE_BACKENDS), default="journal")
+    parser.add_argument("--snapshot-format", choices=["binary", "json"], help="json and journal storage only, defaults to binary")
+    parser.add_argument("--id-generator", choices=["uuid", "qr"], default="uuid")
+    parser.add_argument("--operations", type=int, default=1000, help="check-ins, lunches, searches and stats calls per size")
+    parser.add_argument("--output", help="results file, defaults to benchmarks/results/core_operations_<timestamp>.json")
+    parser.add_argument("--single-size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.storage == "sqlite":
+        if args.snapshot_format:
+            parser.error("--snapshot-format does not apply to sqlite storage")
+    else:
+        args.snapshot_format = args.snapshot_format or "binary"
+
+    if args.single_size:
+        # child mode: one size per process so peak memory isn't carried over between sizes
+        print(json.dumps(run_size(args.single_size, args.storage, args.snapshot_format, args.id_generator, args.operations)))
+        return
+
+    runs = []
+    storage = f"{args.storage} storage" + (f", {args.snapshot_format} snapshot" if args.snapshot_format else "")
+    snapshot_args = ["--snapshot-format", args.snapshot_format] if args.snapshot_format else []
+    for rows in args.sizes:
+        print(f"Benchmarking {rows} attendees ({storage})...")
+        child = subprocess.run([
+            sys.executable, os.path.abspath(__file__),
+            "--single-size", str(rows),
+            "--storage", args.storage,
+            *snapshot_args,
+            "--id-generator", args.id_generator,
+            "--operations", str(args.operations)
+        ], capture_output=True, text=True, check=True)
+        run = json.loads(child.stdout.strip().splitlines()[-1])
+        runs.append(run)
+        for name, result in run["operations"].items():
+            print(f"  {name:28s} {result['mean_seconds'] * 1000:10.3f} ms x {result['calls']}")
+        print(f"  {'peak memory':28s} {run['peak_rss_kb'] / 1024:10.1f} MiB")
+
+    timestamp = datetime.datetime.now()
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "results", f"core_operations_{timestamp.strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "revision": git_revision(),
+            "timestamp": timestamp.isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "storage": args.storage,
+            "snapshot_format": args.snapshot_format,
+            "id_generator": args.id_generator,
+            "runs": runs
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
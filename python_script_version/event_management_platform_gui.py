@@ -6,7 +6,7 @@ import csv
 from tabulate import tabulate
 import sys
 from typing import Dict, List, Optional
-from event_tracker import EventManager, QRCodeGenerator, Attendee
+from event_tracker import EventManager, QRCodeGenerator, JournaledDataStore, Attendee
 
 class EventManagementGUI:
     
@@ -17,7 +17,7 @@ class EventManagementGUI:
         self.root.minsize(900, 600)
         
         
-        self.event_manager = EventManager(id_generator=QRCodeGenerator())
+        self.event_manager = EventManager(id_generator=QRCodeGenerator(), data_store=JournaledDataStore(snapshot_format="binary"))
         
         self.setup_ui()
         
@@ -244,11 +244,8 @@ class EventManagementGUI:
         item_values = self.attendee_tree.item(tree_item, "values")
         email = item_values[1]  
         
-        for attendee_id, attendee in self.event_manager.attendees.items():
-            if attendee.email == email:
-                return attendee_id
-        
-        return None
+        attendee = self.event_manager.find_by_email(email)
+        return attendee.unique_id if attendee else None
     
     def update_stats(self):
         stats = self.event_manager.get_stats()
@@ -317,7 +314,11 @@ class EventManagementGUI:
             self.update_stats()
     
     def create_backup(self):
-        backup_file = self.event_manager.create_manual_backup()
+        try:
+            backup_file = self.event_manager.create_manual_backup()
+        except Exception as e:
+            messagebox.showerror("Backup Error", f"An error occurred while creating the backup: {str(e)}")
+            return
         messagebox.showinfo("Backup", f"Manual backup created successfully: {backup_file}")
     
     def browse_file(self):
@@ -344,6 +345,9 @@ class EventManagementGUI:
             messagebox.showinfo("Import Successful", 
                                f"Successfully imported {count} attendees.\nID files generated in {self.event_manager.id_output_dir}")
             self.import_status_var.set(f"Last import: {count} attendees on {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            if self.event_manager.id_file_errors:
+                failed = "\n".join(f"{email}: {error}" for email, error in self.event_manager.id_file_errors)
+                messagebox.showwarning("ID Generation", f"Failed to generate {len(self.event_manager.id_file_errors)} ID files:\n{failed}")
             
     
             self.populate_attendee_list()
@@ -1,26 +1,66 @@
+import array
+import bisect
 import csv
+import gzip
+import itertools
+import mmap
+import multiprocessing
 import os
+import sqlite3
+import struct
+import sys
 import uuid
 import qrcode
 import json
 import datetime
+import threading
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from tabulate import tabulate
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 
 class Attendee:
+    # one of these per registration, so keep it small: no __dict__, shared role strings and
+    # lunch days stored as bits of an int indexed through LUNCH_DAYS instead of a set of strings
+    __slots__ = ("name", "email", "phone", "role", "unique_id", "check_in_status", "lunch_mask", "kit_collected", "registration_time")
+    
+    LUNCH_DAYS: List[str] = []
+    LUNCH_DAY_BITS: Dict[str, int] = {}
     
     def __init__(self, name: str, email: str, phone: str = "", role: str = "Attendee", unique_id: str = None):
         self.name = name
         self.email = email
         self.phone = phone
-        self.role = role
+        self.role = sys.intern(role)
         self.unique_id = unique_id or str(uuid.uuid4())
         self.check_in_status = False
-        self.lunch_collected = set() 
+        self.lunch_mask = 0
         self.kit_collected = False
         self.registration_time = None
     
+    def __reduce__(self):
+        # lunch bits only mean something in this process, so cross process copies go through to_dict
+        return (Attendee.from_dict, (self.to_dict(),))
+    
+    @classmethod
+    def lunch_day_bit(cls, date: str) -> int:
+        if date not in cls.LUNCH_DAY_BITS:
+            cls.LUNCH_DAY_BITS[date] = 1 << len(cls.LUNCH_DAYS)
+            cls.LUNCH_DAYS.append(date)
+        return cls.LUNCH_DAY_BITS[date]
+    
+    @property
+    def lunch_collected(self) -> set:
+        mask = self.lunch_mask
+        return {date for i, date in enumerate(self.LUNCH_DAYS) if mask >> i & 1}
+    
+    @lunch_collected.setter
+    def lunch_collected(self, dates):
+        self.lunch_mask = 0
+        for date in dates:
+            self.lunch_mask |= self.lunch_day_bit(date)
+    
     def check_in(self) -> bool:
         if self.check_in_status:
             return False 
@@ -32,9 +72,10 @@ class Attendee:
         if not date:
             date = datetime.datetime.now().strftime("%Y-%m-%d")
         
-        if date in self.lunch_collected:
+        bit = self.lunch_day_bit(date)
+        if self.lunch_mask & bit:
             return False  
-        self.lunch_collected.add(date)
+        self.lunch_mask |= bit
         return True
     
     def collect_kit(self) -> bool:
@@ -73,6 +114,225 @@ class Attendee:
 
 
 
+class SearchIndex:
+    # trigram -> array of attendee positions over the lowercased name, email, phone and role; candidates
+    # come from the shortest posting list and are checked with a plain substring test, so stale postings
+    # never show up in results. unique_ids are random, trigram postings for them would outweigh everything
+    # else together, so they match by exact id or prefix through a sorted list instead
+    GRAM_SIZE = 3
+    BUILD_CHUNK = 1000
+    
+    def __init__(self, attendees: Dict[str, Attendee] = None):
+        self.attendees = attendees if attendees is not None else {}
+        self.grams = {}
+        self.texts = []
+        self.uids = []
+        self.positions = {}
+        self.uid_keys = []
+        self.lock = threading.Lock()
+        self.ready = False
+        self.backlog = []
+        self.built = threading.Event()
+    
+    def start(self):
+        # built on a background thread so neither opening an event nor the first search pays for it,
+        # searches until then scan the attendees the way the index would match them
+        threading.Thread(target=self.build, name="search-index", daemon=True).start()
+    
+    def build(self):
+        uids = list(self.attendees)
+        for start in range(0, len(uids), self.BUILD_CHUNK):
+            with self.lock:
+                for uid in uids[start:start + self.BUILD_CHUNK]:
+                    attendee = self.attendees.get(uid)
+                    if attendee is not None:
+                        self.index(attendee)
+        with self.lock:
+            # attendees added while building come after the ones that were there, as in the attendee dict
+            for attendee in self.backlog:
+                self.index(attendee)
+            self.backlog = []
+            self.uid_keys.sort()
+            self.ready = True
+        self.built.set()
+    
+    def wait(self):
+        self.built.wait()
+    
+    @staticmethod
+    def searchable_fields(attendee: Attendee) -> Tuple[str, ...]:
+        return (
+            attendee.name.lower(),
+            attendee.email.lower(),
+            attendee.phone.lower(),
+            attendee.role.lower()
+        )
+    
+    @staticmethod
+    def uid_key(uid: str) -> str:
+        key = uid.lower()
+        # ids are usually lowercase already, keep one string instead of two
+        return uid if key == uid else key
+    
+    def trigrams(self, text: str) -> set:
+        return {text[i:i + self.GRAM_SIZE] for i in range(len(text) - self.GRAM_SIZE + 1)}
+    
+    def add(self, attendee: Attendee):
+        with self.lock:
+            if self.ready:
+                self.index(attendee)
+            else:
+                self.backlog.append(attendee)
+    
+    def index(self, attendee: Attendee):
+        uid = attendee.unique_id
+        fields = self.searchable_fields(attendee)
+        text = "\0".join(fields)
+        position = self.positions.get(uid)
+        if position is None:
+            position = len(self.uids)
+            self.positions[uid] = position
+            self.uids.append(uid)
+            self.texts.append(text)
+            key = (self.uid_key(uid), position)
+            if self.ready:
+                bisect.insort(self.uid_keys, key)
+            else:
+                self.uid_keys.append(key)
+        elif self.texts[position] == text:
+            return
+        else:
+            # postings of the old text stay behind, the substring check filters them out
+            self.texts[position] = text
+        
+        grams = self.grams
+        for gram in set().union(*(self.trigrams(field) for field in fields)):
+            postings = grams.get(gram)
+            if postings is None:
+                grams[gram] = array.array("I", (position,))
+            else:
+                postings.append(position)
+    
+    def matches(self, attendee: Attendee, query: str) -> bool:
+        return any(query in field for field in self.searchable_fields(attendee)) or \
+            self.uid_key(attendee.unique_id).startswith(query)
+    
+    def search(self, query: str) -> List[str]:
+        query = query.lower()
+        with self.lock:
+            if not self.ready:
+                return [uid for uid, attendee in list(self.attendees.items()) if self.matches(attendee, query)]
+            
+            if len(query) < self.GRAM_SIZE:
+                # too short to have a trigram, scan the cached lowercase fields instead
+                candidates = range(len(self.texts))
+            else:
+                postings = [self.grams.get(gram) for gram in self.trigrams(query)]
+                candidates = () if None in postings else min(postings, key=len)
+            texts = self.texts
+            found = {position for position in candidates if query in texts[position]}
+            
+            start = bisect.bisect_left(self.uid_keys, (query,))
+            for key, position in itertools.islice(self.uid_keys, start, None):
+                if not key.startswith(query):
+                    break
+                found.add(position)
+            return [self.uids[position] for position in sorted(found)]
+
+
+class EventStats:
+    # running totals behind EventManager.get_stats, every change to an attendee is applied here in O(1)
+    COUNTERS = ("total_attendees", "checked_in", "kits_distributed", "role_counts", "checked_in_by_role", "lunch_by_date")
+    
+    def __init__(self, attendees: Dict[str, Attendee] = None):
+        self.total_attendees = 0
+        self.checked_in = 0
+        self.kits_distributed = 0
+        self.role_counts = {}
+        self.checked_in_by_role = {}
+        self.lunch_by_date = {}
+        for attendee in (attendees or {}).values():
+            self.add(attendee)
+    
+    @classmethod
+    def from_counters(cls, counters: dict) -> 'EventStats':
+        stats = cls()
+        for name in cls.COUNTERS:
+            setattr(stats, name, counters[name])
+        return stats
+    
+    @classmethod
+    def from_records(cls, records) -> 'EventStats':
+        # the same totals straight from to_dict() records, for writers that only hold those
+        stats = cls()
+        for data in records:
+            stats.count(data.get("role", "Attendee"), data["check_in_status"], data["lunch_collected"], data["kit_collected"], 1)
+        return stats
+    
+    def counters(self) -> dict:
+        return {name: getattr(self, name) for name in self.COUNTERS}
+    
+    def add(self, attendee: Attendee):
+        self.count(attendee.role, attendee.check_in_status, attendee.lunch_collected, attendee.kit_collected, 1)
+    
+    def remove(self, attendee: Attendee):
+        self.count(attendee.role, attendee.check_in_status, attendee.lunch_collected, attendee.kit_collected, -1)
+    
+    @staticmethod
+    def bump(counts: dict, key: str, step: int):
+        # keys that drop to zero go away, get_stats never lists a role or date nobody has
+        value = counts.get(key, 0) + step
+        if value:
+            counts[key] = value
+        else:
+            counts.pop(key, None)
+    
+    def count(self, role: str, check_in_status: bool, lunch_collected, kit_collected: bool, step: int):
+        self.total_attendees += step
+        self.bump(self.role_counts, role, step)
+        if check_in_status:
+            self.checked_in += step
+            self.bump(self.checked_in_by_role, role, step)
+        for date in lunch_collected:
+            self.bump(self.lunch_by_date, date, step)
+        if kit_collected:
+            self.kits_distributed += step
+    
+    def record_check_in(self, attendee: Attendee):
+        self.checked_in += 1
+        self.checked_in_by_role[attendee.role] = self.checked_in_by_role.get(attendee.role, 0) + 1
+    
+    def record_lunch(self, date: str):
+        self.lunch_by_date[date] = self.lunch_by_date.get(date, 0) + 1
+    
+    def record_kit(self):
+        self.kits_distributed += 1
+    
+    def snapshot(self) -> dict:
+        total_attendees = self.total_attendees
+        return {
+            "total_attendees": total_attendees,
+            "checked_in": self.checked_in,
+            "role_counts": dict(self.role_counts),
+            "checked_in_by_role": dict(self.checked_in_by_role),
+            "lunch_by_date": dict(self.lunch_by_date),
+            "kits_distributed": self.kits_distributed,
+            "check_in_percentage": (self.checked_in / total_attendees * 100) if total_attendees > 0 else 0,
+            "kit_distribution_percentage": (self.kits_distributed / total_attendees * 100) if total_attendees > 0 else 0
+        }
+
+
+def save_id_batch(id_generator, attendees: List[Attendee], output_dir: str) -> List[Tuple[Optional[str], Optional[str]]]:
+    # runs in a worker process, one (id_file, error) per attendee so a bad row doesn't sink its batch
+    results = []
+    for attendee in attendees:
+        try:
+            results.append((id_generator.save_id(attendee, output_dir), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
+
+
 class UUIDGenerator:
     def generate_id(self) -> str:
         return str(uuid.uuid4())
@@ -108,24 +368,401 @@ class QRCodeGenerator:
         return file_path
 
 
+class LazyAttendees(MutableMapping):
+    # dict of unique_id -> Attendee over a mapped binary snapshot, records are decoded on first access
+    # and the mapping is closed once every record has been decoded
+    
+    def __init__(self, snapshot: mmap.mmap, uids: List[str], offsets: array.array, records_start: int, version: int):
+        self.snapshot = snapshot
+        self.offsets = offsets
+        self.records_start = records_start
+        self.version = version
+        self.records = dict(zip(uids, range(len(uids))))
+        self.pending = len(uids)
+        self.email_index = None
+        self.stats_counters = None
+        # the search index decodes on its own thread
+        self.lock = threading.Lock()
+        if not self.pending:
+            self.close()
+    
+    def __getitem__(self, uid: str) -> Attendee:
+        record = self.records[uid]
+        if isinstance(record, int):
+            with self.lock:
+                record = self.records[uid]
+                if isinstance(record, int):
+                    start = self.records_start + self.offsets[record]
+                    end = self.records_start + self.offsets[record + 1]
+                    record = BinarySnapshot.decode_record(uid, self.snapshot[start:end], self.version)
+                    self.records[uid] = record
+                    self.pending -= 1
+                    if not self.pending:
+                        self.close()
+        return record
+    
+    def __setitem__(self, uid: str, attendee: Attendee):
+        with self.lock:
+            if isinstance(self.records.get(uid), int):
+                self.pending -= 1
+            self.records[uid] = attendee
+            if not self.pending:
+                self.close()
+    
+    def __delitem__(self, uid: str):
+        with self.lock:
+            if isinstance(self.records.pop(uid), int):
+                self.pending -= 1
+            if not self.pending:
+                self.close()
+    
+    def __iter__(self):
+        return iter(self.records)
+    
+    def __len__(self) -> int:
+        return len(self.records)
+    
+    def __contains__(self, uid) -> bool:
+        return uid in self.records
+    
+    def close(self):
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+
+
+class BinarySnapshot:
+    # header, then every unique_id joined by NUL, the normalized emails joined by NUL in the same order,
+    # the stats counters as json, a uint64 offset table, then one record per attendee: a uint16 field
+    # count, a uint32 byte length per field, then the UTF-8 fields with lunch dates trailing.
+    # the emails and counters let EventManager open an event without decoding a single record
+    MAGIC = b"SNUCCATT"
+    VERSION = 3
+    PREFIX = struct.Struct("<8sH")
+    HEADER = struct.Struct("<8sHIIII")
+    # versions 1 and 2 have no emails or counters, version 1 joined the fields with 0x1f
+    LEGACY_HEADER = struct.Struct("<8sHII")
+    LEGACY_SEPARATOR = "\x1f"
+    FIELD_COUNT = struct.Struct("<H")
+    
+    @classmethod
+    def encode_record(cls, data: dict) -> bytes:
+        fields = [
+            data["name"],
+            data["email"],
+            data.get("phone", "") or "",
+            data.get("role", "Attendee"),
+            data["registration_time"] or "",
+            "1" if data["check_in_status"] else "0",
+            "1" if data["kit_collected"] else "0",
+        ] + list(data["lunch_collected"])
+        encoded = [field.encode("utf-8") for field in fields]
+        return struct.pack(f"<H{len(encoded)}I", len(encoded), *map(len, encoded)) + b"".join(encoded)
+    
+    @classmethod
+    def decode_fields(cls, record: bytes) -> List[str]:
+        (count,) = cls.FIELD_COUNT.unpack_from(record, 0)
+        lengths = struct.unpack_from(f"<{count}I", record, cls.FIELD_COUNT.size)
+        position = cls.FIELD_COUNT.size + 4 * count
+        fields = []
+        for length in lengths:
+            fields.append(record[position:position + length].decode("utf-8"))
+            position += length
+        return fields
+    
+    @classmethod
+    def decode_record(cls, uid: str, record: bytes, version: int = VERSION) -> Attendee:
+        if version == 1:
+            fields = record.decode("utf-8").split(cls.LEGACY_SEPARATOR)
+        else:
+            fields = cls.decode_fields(record)
+        name, email, phone, role, registration_time, check_in_status, kit_collected, *lunch_collected = fields
+        attendee = Attendee(name=name, email=email, phone=phone, role=role, unique_id=uid)
+        attendee.check_in_status = check_in_status == "1"
+        attendee.kit_collected = kit_collected == "1"
+        attendee.registration_time = registration_time or None
+        attendee.lunch_collected = lunch_collected
+        return attendee
+    
+    @classmethod
+    def write(cls, path: str, data: Dict[str, dict]):
+        emails = [EventManager.normalize_email(attendee_data["email"]) for attendee_data in data.values()]
+        if any("\0" in value for value in itertools.chain(data, emails)):
+            raise ValueError("A unique_id or email can't contain a NUL character")
+        uid_blob = "\0".join(data).encode("utf-8")
+        email_blob = "\0".join(emails).encode("utf-8")
+        stats_blob = json.dumps(EventStats.from_records(data.values()).counters()).encode("utf-8")
+        offsets = array.array("Q", [0])
+        records = []
+        for attendee_data in data.values():
+            record = cls.encode_record(attendee_data)
+            records.append(record)
+            offsets.append(offsets[-1] + len(record))
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        
+        with open(path, "wb") as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(records), len(uid_blob), len(email_blob), len(stats_blob)))
+            f.write(uid_blob)
+            f.write(email_blob)
+            f.write(stats_blob)
+            f.write(offsets.tobytes())
+            f.writelines(records)
+    
+    @classmethod
+    def open(cls, path: str) -> LazyAttendees:
+        with open(path, "rb") as f:
+            snapshot = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, version = cls.PREFIX.unpack_from(snapshot, 0)
+        if magic != cls.MAGIC:
+            snapshot.close()
+            raise ValueError(f"{path} is not an attendee snapshot")
+        if version not in (1, 2, cls.VERSION):
+            snapshot.close()
+            raise ValueError(f"Unsupported attendee snapshot version {version} in {path}")
+        
+        if version == cls.VERSION:
+            _, _, count, uid_blob_size, email_blob_size, stats_blob_size = cls.HEADER.unpack_from(snapshot, 0)
+            uids_start = cls.HEADER.size
+        else:
+            _, _, count, uid_blob_size = cls.LEGACY_HEADER.unpack_from(snapshot, 0)
+            email_blob_size = stats_blob_size = 0
+            uids_start = cls.LEGACY_HEADER.size
+        emails_start = uids_start + uid_blob_size
+        stats_start = emails_start + email_blob_size
+        offsets_start = stats_start + stats_blob_size
+        uids = snapshot[uids_start:emails_start].decode("utf-8").split("\0") if count else []
+        offsets = array.array("Q")
+        offsets.frombytes(snapshot[offsets_start:offsets_start + (count + 1) * offsets.itemsize])
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        
+        attendees = LazyAttendees(snapshot, uids, offsets, offsets_start + (count + 1) * offsets.itemsize, version)
+        if version == cls.VERSION:
+            emails = snapshot[emails_start:stats_start].decode("utf-8").split("\0") if count else []
+            attendees.email_index = dict(zip(emails, uids))
+            attendees.stats_counters = json.loads(snapshot[stats_start:offsets_start])
+        return attendees
+    
+    @classmethod
+    def from_json(cls, json_path: str, binary_path: str):
+        with open(json_path, "r") as f:
+            cls.write(binary_path, json.load(f))
+    
+    @classmethod
+    def to_json(cls, binary_path: str, json_path: str):
+        attendees = cls.open(binary_path)
+        data = {uid: attendee.to_dict() for uid, attendee in attendees.items()}
+        with open(json_path, "w") as f:
+            json.dump(data, f, indent=2)
+
+
+class IncrementalBackups:
+    # a generation is one gzipped full copy followed by gzipped deltas holding only the attendees that
+    # changed since the backup before, manifest.json lists every backup in order so any of them can be rebuilt
+    
+    def __init__(self, backup_dir: str, full_every: int = 12, keep_generations: int = 5):
+        self.backup_dir = backup_dir
+        self.manifest_file = os.path.join(backup_dir, "manifest.json")
+        self.full_every = full_every
+        self.keep_generations = keep_generations
+        self.last_state = None
+        # a single worker keeps backups in order and off the scanning thread
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = []
+        
+        if not os.path.exists(backup_dir):
+            os.makedirs(backup_dir)
+        self.manifest = self.load_manifest()
+        self.next_sequence = self.manifest[-1]["sequence"] + 1 if self.manifest else 0
+    
+    def load_manifest(self) -> List[dict]:
+        if not os.path.exists(self.manifest_file):
+            return []
+        with open(self.manifest_file, "r") as f:
+            return json.load(f)
+    
+    def save_manifest(self):
+        tmp_file = self.manifest_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_file, self.manifest_file)
+    
+    def backup(self, attendees: Dict[str, Attendee], manual=False) -> str:
+        timestamp = datetime.datetime.now()
+        prefix = "manual_backup" if manual else "backup"
+        self.pending = [future for future in self.pending if not future.done()]
+        sequence = self.next_sequence
+        self.next_sequence += 1
+        backup_file = os.path.join(self.backup_dir, f"{prefix}_{timestamp.strftime('%Y%m%d_%H%M%S')}_{sequence:06d}.json.gz")
+        
+        # only the fields a scan can change are captured here, records are serialized by the worker
+        snapshot = [
+            (attendee, attendee.check_in_status, attendee.kit_collected, attendee.lunch_mask, attendee.registration_time)
+            for attendee in attendees.values()
+        ]
+        future = self.executor.submit(self.write_backup, snapshot, backup_file, sequence, timestamp, manual)
+        if manual:
+            # the caller reports the backup as created, so wait for the file and let a failure reach it
+            future.result()
+        else:
+            self.pending.append(future)
+        return backup_file
+    
+    def wait(self):
+        for future in self.pending:
+            future.result()
+        self.pending = []
+    
+    @staticmethod
+    def captured_record(attendee: Attendee, check_in_status: bool, kit_collected: bool, lunch_mask: int, registration_time) -> dict:
+        data = attendee.to_dict()
+        data["check_in_status"] = check_in_status
+        data["kit_collected"] = kit_collected
+        data["lunch_collected"] = [date for i, date in enumerate(Attendee.LUNCH_DAYS) if lunch_mask >> i & 1]
+        data["registration_time"] = str(registration_time) if registration_time else None
+        return data
+    
+    def write_backup(self, snapshot: List[tuple], backup_file: str, sequence: int, timestamp: datetime.datetime, manual: bool):
+        try:
+            state = {captured[0].unique_id: self.captured_record(*captured) for captured in snapshot}
+            if self.last_state is None and self.manifest:
+                self.last_state = self.restore_data(self.manifest[-1]["file"])
+            
+            entries_since_full = 0
+            for entry in reversed(self.manifest):
+                if entry["kind"] == "full":
+                    break
+                entries_since_full += 1
+            
+            if not self.manifest or entries_since_full + 1 >= self.full_every:
+                kind, base = "full", os.path.basename(backup_file)
+                payload = {"attendees": state}
+            else:
+                kind, base = "delta", self.manifest[-1]["base"]
+                payload = {
+                    "changed": {uid: data for uid, data in state.items() if self.last_state.get(uid) != data},
+                    "removed": [uid for uid in self.last_state if uid not in state],
+                    "order": list(state) if list(state) != list(self.last_state) else None
+                }
+            
+            with gzip.open(backup_file, "wt") as f:
+                json.dump(payload, f)
+            
+            self.last_state = state
+            self.manifest.append({
+                "file": os.path.basename(backup_file),
+                "sequence": sequence,
+                "kind": kind,
+                "base": base,
+                "created": timestamp.isoformat(),
+                "manual": manual
+            })
+            self.prune()
+            self.save_manifest()
+        except Exception as e:
+            if not manual:
+                print(f"Error writing backup {backup_file}: {e}")
+            raise
+    
+    def prune(self):
+        bases = [entry["file"] for entry in self.manifest if entry["kind"] == "full"]
+        expired = set(bases[:-self.keep_generations]) if len(bases) > self.keep_generations else set()
+        if not expired:
+            return
+        
+        for entry in self.manifest:
+            if entry["base"] in expired:
+                path = os.path.join(self.backup_dir, entry["file"])
+                if os.path.exists(path):
+                    os.remove(path)
+        self.manifest = [entry for entry in self.manifest if entry["base"] not in expired]
+    
+    def restore_data(self, backup_file: str) -> Dict[str, dict]:
+        backup_file = os.path.basename(backup_file)
+        position = next((i for i, entry in enumerate(self.manifest) if entry["file"] == backup_file), None)
+        if position is None:
+            raise ValueError(f"Backup {backup_file} not found")
+        
+        base = self.manifest[position]["base"]
+        state = {}
+        for entry in self.manifest[:position + 1]:
+            if entry["base"] != base:
+                continue
+            with gzip.open(os.path.join(self.backup_dir, entry["file"]), "rt") as f:
+                payload = json.load(f)
+            
+            if entry["kind"] == "full":
+                state = payload["attendees"]
+                continue
+            state.update(payload["changed"])
+            for uid in payload["removed"]:
+                state.pop(uid, None)
+            if payload["order"]:
+                state = {uid: state[uid] for uid in payload["order"]}
+        return state
+    
+    def restore(self, backup_file: str = None, at: datetime.datetime = None) -> Dict[str, Attendee]:
+        self.wait()
+        if not backup_file:
+            at = at or datetime.datetime.now()
+            candidates = [entry["file"] for entry in self.manifest if datetime.datetime.fromisoformat(entry["created"]) <= at]
+            if not candidates:
+                raise ValueError(f"No backup taken before {at}")
+            backup_file = candidates[-1]
+        
+        return {uid: Attendee.from_dict(data) for uid, data in self.restore_data(backup_file).items()}
+
+
 class DataStore:
     
-    def __init__(self, storage_path: str = "event_data"):
+    def __init__(self, storage_path: str = "event_data", snapshot_format: str = "json"):
+        if snapshot_format not in ("json", "binary"):
+            raise ValueError(f"Unknown snapshot format: {snapshot_format}")
         self.storage_path = storage_path
-        self.attendees_file = os.path.join(storage_path, "attendees.json")
+        self.snapshot_format = snapshot_format
+        self.json_file = os.path.join(storage_path, "attendees.json")
+        self.attendees_file = os.path.join(storage_path, "attendees.bin") if snapshot_format == "binary" else self.json_file
+        self.loaded_indexes = None
         self.ensure_storage_exists()
+        self.backups = IncrementalBackups(os.path.join(storage_path, "backups"))
     
     def ensure_storage_exists(self):
         if not os.path.exists(self.storage_path):
             os.makedirs(self.storage_path)
     
+    def write_snapshot(self, data: dict):
+        tmp_file = self.attendees_file + ".tmp"
+        if self.snapshot_format == "binary":
+            BinarySnapshot.write(tmp_file, data)
+        else:
+            with open(tmp_file, "w") as f:
+                json.dump(data, f, indent=2)
+        os.replace(tmp_file, self.attendees_file)
+    
     def save_attendees(self, attendees: Dict[str, Attendee]):
         data = {uid: attendee.to_dict() for uid, attendee in attendees.items()}
-        with open(self.attendees_file, "w") as f:
-            json.dump(data, f, indent=2)
+        self.write_snapshot(data)
     
     def load_attendees(self) -> Dict[str, Attendee]:
+        self.loaded_indexes = None
+        if self.snapshot_format == "binary":
+            if not os.path.exists(self.attendees_file) and os.path.exists(self.json_file):
+                # events created before the binary format existed; the json is moved aside so nothing
+                # reads it as live data once the binary snapshot has taken over
+                BinarySnapshot.from_json(self.json_file, self.attendees_file)
+                os.replace(self.json_file, self.json_file + ".migrated")
+            if not os.path.exists(self.attendees_file):
+                return {}
+            attendees = BinarySnapshot.open(self.attendees_file)
+            if attendees.email_index is not None:
+                self.loaded_indexes = (attendees.email_index, EventStats.from_counters(attendees.stats_counters))
+            return attendees
+        
         if not os.path.exists(self.attendees_file):
+            if os.path.exists(os.path.join(self.storage_path, "attendees.bin")):
+                raise ValueError(f"The event in {self.storage_path} has been converted to the binary snapshot format")
             return {}
         
         with open(self.attendees_file, "r") as f:
@@ -133,41 +770,321 @@ class DataStore:
         
         return {uid: Attendee.from_dict(attendee_data) for uid, attendee_data in data.items()}
     
-    def create_backup(self, manual=False) -> str:
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        prefix = "manual_backup" if manual else "backup"
-        backup_file = os.path.join(self.storage_path, f"{prefix}_{timestamp}.json")
+    def load_indexes(self) -> Optional[Tuple[Dict[str, str], EventStats]]:
+        # the email index and stats counters saved with what load_attendees just returned, or None
+        # when they weren't saved and EventManager has to build them from every attendee
+        return self.loaded_indexes
+    
+    def create_backup(self, attendees: Dict[str, Attendee], manual=False) -> str:
+        return self.backups.backup(attendees, manual)
+    
+    def restore_backup(self, backup_file: str = None, at: datetime.datetime = None) -> Dict[str, Attendee]:
+        attendees = self.backups.restore(backup_file, at)
+        self.save_attendees(attendees)
+        return attendees
+
+    def update_attendee(self, attendees: Dict[str, Attendee], attendee: Attendee):
+        self.save_attendees(attendees)
+
+
+class JournaledDataStore(DataStore):
+    # the snapshot is only rewritten on compaction, every single change in between is appended to
+    # attendees.journal as one json line holding the full record, so replaying a record twice is harmless
+
+    def __init__(self, storage_path: str = "event_data", compact_threshold: int = 4 * 1024 * 1024, snapshot_format: str = "binary"):
+        super().__init__(storage_path, snapshot_format)
+        self.journal_file = os.path.join(storage_path, "attendees.journal")
+        self.compacting_file = os.path.join(storage_path, "attendees.journal.compacting")
+        self.compact_threshold = compact_threshold
+        self.lock = threading.Lock()
+        self.compaction_thread = None
+        self.attendees = {}
+    
+    def wait_for_compaction(self):
+        if self.compaction_thread:
+            self.compaction_thread.join()
+            self.compaction_thread = None
+    
+    def save_attendees(self, attendees: Dict[str, Attendee]):
+        self.wait_for_compaction()
+        with self.lock:
+            self.attendees = attendees
+            self.write_snapshot({uid: attendee.to_dict() for uid, attendee in attendees.items()})
+            for path in (self.journal_file, self.compacting_file):
+                if os.path.exists(path):
+                    os.remove(path)
+    
+    def update_attendee(self, attendees: Dict[str, Attendee], attendee: Attendee):
+        record = json.dumps({"uid": attendee.unique_id, "attendee": attendee.to_dict()})
+        with self.lock:
+            self.attendees = attendees
+            with open(self.journal_file, "a") as f:
+                f.write(record + "\n")
+                journal_size = f.tell()
         
-        if os.path.exists(self.attendees_file):
-            with open(self.attendees_file, "r") as src:
-                with open(backup_file, "w") as dst:
-                    dst.write(src.read())
+        if journal_size >= self.compact_threshold and not (self.compaction_thread and self.compaction_thread.is_alive()):
+            self.start_compaction()
+    
+    def start_compaction(self):
+        with self.lock:
+            if not os.path.exists(self.journal_file) or os.path.exists(self.compacting_file):
+                return
+            # new records go to a fresh journal while the old one is folded into the snapshot
+            os.replace(self.journal_file, self.compacting_file)
+            data = {uid: attendee.to_dict() for uid, attendee in self.attendees.items()}
         
-        return backup_file
+        self.compaction_thread = threading.Thread(target=self.compact, args=(data,), daemon=True)
+        self.compaction_thread.start()
+    
+    def compact(self, data: dict):
+        try:
+            self.write_snapshot(data)
+            os.remove(self.compacting_file)
+        except OSError as e:
+            print(f"Error compacting journal: {e}")
+    
+    def replay_journal(self, path: str, attendees: Dict[str, Attendee], replaced: Dict[str, Optional[Attendee]]):
+        # replaced collects each replayed uid's attendee as it was before the journal
+        if not os.path.exists(path):
+            return
+        
+        with open(path, "rb+") as f:
+            valid_end = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                uid = record["uid"]
+                if uid not in replaced:
+                    replaced[uid] = attendees.get(uid)
+                attendees[uid] = Attendee.from_dict(record["attendee"])
+                valid_end += len(line)
+            # a crash mid-append leaves a torn last line; cut it off so the next append
+            # starts a fresh line instead of being glued onto it and lost on replay
+            if f.seek(0, os.SEEK_END) > valid_end:
+                f.truncate(valid_end)
+    
+    def load_attendees(self) -> Dict[str, Attendee]:
+        self.wait_for_compaction()
+        with self.lock:
+            attendees = super().load_attendees()
+            replaced = {}
+            self.replay_journal(self.compacting_file, attendees, replaced)
+            self.replay_journal(self.journal_file, attendees, replaced)
+            self.attendees = attendees
+            if self.loaded_indexes:
+                # the saved indexes describe the snapshot, move the replayed attendees over to their journal state
+                email_index, stats = self.loaded_indexes
+                for uid, previous in replaced.items():
+                    if previous is not None:
+                        stats.remove(previous)
+                        email = EventManager.normalize_email(previous.email)
+                        if email_index.get(email) == uid:
+                            del email_index[email]
+                    stats.add(attendees[uid])
+                    email_index[EventManager.normalize_email(attendees[uid].email)] = uid
+        return attendees
+
+
+class SQLiteDataStore(DataStore):
+    # one row per attendee plus one row per lunch, so a scan is a single UPDATE on the primary key
+    
+    def __init__(self, storage_path: str = "event_data"):
+        super().__init__(storage_path)
+        self.binary_file = os.path.join(storage_path, "attendees.bin")
+        self.attendees_file = os.path.join(storage_path, "attendees.db")
+        self.connection = sqlite3.connect(self.attendees_file, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.create_tables()
+    
+    def create_tables(self):
+        with self.connection:
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS attendees (
+                    unique_id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    email TEXT NOT NULL,
+                    phone TEXT NOT NULL DEFAULT '',
+                    role TEXT NOT NULL DEFAULT 'Attendee',
+                    check_in_status INTEGER NOT NULL DEFAULT 0,
+                    kit_collected INTEGER NOT NULL DEFAULT 0,
+                    registration_time TEXT
+                )
+            """)
+            self.connection.execute("CREATE INDEX IF NOT EXISTS ix_attendees_email ON attendees (email)")
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS lunches (
+                    unique_id TEXT NOT NULL REFERENCES attendees (unique_id),
+                    date TEXT NOT NULL,
+                    PRIMARY KEY (unique_id, date)
+                )
+            """)
+    
+    @staticmethod
+    def attendee_row(attendee: Attendee) -> tuple:
+        return (
+            attendee.unique_id,
+            attendee.name,
+            attendee.email,
+            attendee.phone or "",
+            attendee.role,
+            int(attendee.check_in_status),
+            int(attendee.kit_collected),
+            str(attendee.registration_time) if attendee.registration_time else None
+        )
+    
+    def save_attendees(self, attendees: Dict[str, Attendee]):
+        # a full replace in one transaction (restoring a backup relies on that), but existing rows are
+        # upserted rather than reinserted so they keep their rowid and with it the listing order
+        with self.connection:
+            self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS saved_uids (unique_id TEXT PRIMARY KEY)")
+            self.connection.execute("DELETE FROM saved_uids")
+            self.connection.executemany("INSERT INTO saved_uids (unique_id) VALUES (?)", ((uid,) for uid in attendees))
+            self.connection.execute("DELETE FROM lunches")
+            self.connection.execute("DELETE FROM attendees WHERE unique_id NOT IN (SELECT unique_id FROM saved_uids)")
+            self.connection.execute("DELETE FROM saved_uids")
+            self.connection.executemany("""
+                INSERT INTO attendees (unique_id, name, email, phone, role, check_in_status, kit_collected, registration_time)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (unique_id) DO UPDATE SET
+                    name = excluded.name,
+                    email = excluded.email,
+                    phone = excluded.phone,
+                    role = excluded.role,
+                    check_in_status = excluded.check_in_status,
+                    kit_collected = excluded.kit_collected,
+                    registration_time = excluded.registration_time
+            """, (self.attendee_row(attendee) for attendee in attendees.values()))
+            self.connection.executemany(
+                "INSERT INTO lunches (unique_id, date) VALUES (?, ?)",
+                ((uid, date) for uid, attendee in attendees.items() for date in attendee.lunch_collected)
+            )
+    
+    def update_attendee(self, attendees: Dict[str, Attendee], attendee: Attendee):
+        with self.connection:
+            self.connection.execute(
+                "UPDATE attendees SET check_in_status = ?, kit_collected = ?, registration_time = ? WHERE unique_id = ?",
+                self.attendee_row(attendee)[5:] + (attendee.unique_id,)
+            )
+            self.connection.execute("DELETE FROM lunches WHERE unique_id = ?", (attendee.unique_id,))
+            self.connection.executemany(
+                "INSERT INTO lunches (unique_id, date) VALUES (?, ?)",
+                ((attendee.unique_id, date) for date in attendee.lunch_collected)
+            )
+    
+    def load_attendees(self) -> Dict[str, Attendee]:
+        if (os.path.exists(self.binary_file) or os.path.exists(self.json_file)) \
+                and not self.connection.execute("SELECT 1 FROM attendees LIMIT 1").fetchone():
+            self.migrate_existing_event()
+        
+        lunches = {}
+        for uid, date in self.connection.execute("SELECT unique_id, date FROM lunches"):
+            lunches.setdefault(uid, []).append(date)
+        
+        attendees = {}
+        for row in self.connection.execute("""
+            SELECT unique_id, name, email, phone, role, check_in_status, kit_collected, registration_time
+            FROM attendees ORDER BY rowid
+        """):
+            uid, name, email, phone, role, check_in_status, kit_collected, registration_time = row
+            attendee = Attendee(name=name, email=email, phone=phone, role=role, unique_id=uid)
+            attendee.check_in_status = bool(check_in_status)
+            attendee.kit_collected = bool(kit_collected)
+            attendee.registration_time = registration_time
+            attendee.lunch_collected = lunches.get(uid, ())
+            attendees[uid] = attendee
+        return attendees
+    
+    def migrate_existing_event(self) -> int:
+        # the event as the journaled store sees it, snapshot plus journal, not just the snapshot
+        snapshot_format = "binary" if os.path.exists(self.binary_file) else "json"
+        attendees = JournaledDataStore(self.storage_path, snapshot_format=snapshot_format).load_attendees()
+        self.save_attendees(attendees)
+        return len(attendees)
+
+
+STORAGE_BACKENDS = {
+    "json": DataStore,
+    "journal": JournaledDataStore,
+    "sqlite": SQLiteDataStore,
+}
 
 
 class EventManager:
-    def __init__(self, id_generator=None):
+    def __init__(self, id_generator=None, data_store=None, debug_stats: bool = False, storage: str = "journal"):
         self.id_generator = id_generator if id_generator else UUIDGenerator()
-        self.data_store = DataStore()
+        if not data_store and storage not in STORAGE_BACKENDS:
+            raise ValueError(f"Unknown storage backend: {storage}")
+        self.data_store = data_store if data_store else STORAGE_BACKENDS[storage]()
         self.attendees = self.data_store.load_attendees()
+        self.email_index, self.stats = self.data_store.load_indexes() or (self.build_email_index(), EventStats(self.attendees))
+        self.search_index = SearchIndex(self.attendees)
+        self.search_index.start()
+        self.debug_stats = debug_stats
+        self.id_file_errors = []
         self.id_output_dir = os.path.join(self.data_store.storage_path, "ids")
         
         if not os.path.exists(self.id_output_dir):
             os.makedirs(self.id_output_dir)
     
+    @staticmethod
+    def normalize_email(email: str) -> str:
+        return email.strip().lower()
+    
+    def build_email_index(self) -> Dict[str, str]:
+        return {self.normalize_email(attendee.email): uid for uid, attendee in self.attendees.items()}
+    
+    def add_attendee(self, attendee: Attendee):
+        self.attendees[attendee.unique_id] = attendee
+        self.email_index[self.normalize_email(attendee.email)] = attendee.unique_id
+        self.search_index.add(attendee)
+        self.stats.add(attendee)
+    
+    def find_by_email(self, email: str) -> Optional[Attendee]:
+        unique_id = self.email_index.get(self.normalize_email(email))
+        return self.attendees.get(unique_id) if unique_id else None
+    
+    def generate_id_files(self, attendees: List[Attendee]) -> Iterator[Tuple[Attendee, Optional[str], Optional[str]]]:
+        # yields (attendee, id_file, error) as batches complete, one worker process per core
+        if not attendees:
+            return
+        
+        workers = min(os.cpu_count() or 1, len(attendees))
+        # batches amortize the pickling round trip, several per worker keep results streaming
+        batch_size = max(1, min(256, len(attendees) // (workers * 4)))
+        batches = [attendees[i:i + batch_size] for i in range(0, len(attendees), batch_size)]
+        
+        # a forked worker would inherit the backup, compaction and search index threads along with any
+        # lock they held at that moment; forkserver (spawn where it is missing, as on Windows) starts clean
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(start_method)) as pool:
+            futures = {pool.submit(save_id_batch, self.id_generator, batch, self.id_output_dir): batch for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    results = [(None, str(e))] * len(batch)
+                for attendee, (id_file, error) in zip(batch, results):
+                    yield attendee, id_file, error
+    
     def import_attendees_from_csv(self, csv_file: str) -> Tuple[int, List[str]]:
-        imported_count = 0
+        new_attendees = []
         id_files = []
+        self.id_file_errors = []
         
         try:
             with open(csv_file, "r") as f:
                 reader = csv.DictReader(f)
                 for row in reader:
-                    if any(attendee.email == row["Email"] for attendee in self.attendees.values()):
+                    if self.normalize_email(row["Email"]) in self.email_index:
                         continue
                     
-                    unique_id = self.id_generator.generate_id(None)
+                    unique_id = self.id_generator.generate_id()
                     attendee = Attendee(
                         name=row["Name"],
                         email=row["Email"],
@@ -177,24 +1094,27 @@ class EventManager:
                     )
                     
                    
-                    self.attendees[unique_id] = attendee
-                    imported_count += 1
-                    
-                    #
-                    id_file = self.id_generator.save_id(attendee, self.id_output_dir)
-                    id_files.append(id_file)
+                    self.add_attendee(attendee)
+                    new_attendees.append(attendee)
             
        
             self.data_store.save_attendees(self.attendees)
             
            
-            self.data_store.create_backup()
-            
-            return imported_count, id_files
+            self.data_store.create_backup(self.attendees)
             
-        except Exception:
-            print(f"Error importing attendees: {Exception}")
+        except Exception as e:
+            print(f"Error importing attendees: {e}")
             return 0, []
+        
+        # attendees are already saved, a failed id file only needs regenerating, not a re-import
+        for attendee, id_file, error in self.generate_id_files(new_attendees):
+            if error:
+                self.id_file_errors.append((attendee.email, error))
+            else:
+                id_files.append(id_file)
+        
+        return len(new_attendees), id_files
     
     def check_in_attendee(self, unique_id: str) -> Tuple[bool, str]:
     
@@ -207,7 +1127,8 @@ class EventManager:
         
         success = attendee.check_in()
         if success:
-            self.data_store.save_attendees(self.attendees)
+            self.stats.record_check_in(attendee)
+            self.data_store.update_attendee(self.attendees, attendee)
             return True, f"Successfully checked in {attendee.name}"
         else:
             return False, "Check-in failed"
@@ -228,7 +1149,8 @@ class EventManager:
         
         success = attendee.collect_lunch(date)
         if success:
-            self.data_store.save_attendees(self.attendees)
+            self.stats.record_lunch(date)
+            self.data_store.update_attendee(self.attendees, attendee)
             return True, f"Successfully marked lunch collected for {attendee.name}"
         else:
             return False, "Lunch collection marking failed"
@@ -246,12 +1168,21 @@ class EventManager:
         
         success = attendee.collect_kit()
         if success:
-            self.data_store.save_attendees(self.attendees)
+            self.stats.record_kit()
+            self.data_store.update_attendee(self.attendees, attendee)
             return True, f"Successfully marked kit collected for {attendee.name}"
         else:
             return False, "Kit collection marking failed"
     
     def get_stats(self) -> dict:
+        stats = self.stats.snapshot()
+        if self.debug_stats:
+            expected = self.compute_stats()
+            if stats != expected:
+                raise RuntimeError(f"Stats counters out of sync: {stats} != {expected}")
+        return stats
+    
+    def compute_stats(self) -> dict:
         total_attendees = len(self.attendees)
         checked_in = sum(1 for attendee in self.attendees.values() if attendee.check_in_status)
         
@@ -282,18 +1213,7 @@ class EventManager:
         }
     
     def search_attendees(self, query: str) -> List[Attendee]:
-        results = []
-        query = query.lower()
-        
-        for attendee in self.attendees.values():
-            if (query in attendee.name.lower() or 
-                query in attendee.email.lower() or 
-                query in attendee.phone.lower() or
-                query in attendee.role.lower() or
-                query in attendee.unique_id.lower()):
-                results.append(attendee)
-        
-        return results
+        return [self.attendees[uid] for uid in self.search_index.search(query)]
     
     def export_report(self, filename: str = None) -> str:
         if not filename:
@@ -325,14 +1245,24 @@ class EventManager:
         return file_path
     
     def create_manual_backup(self) -> str:
-        backup_file = self.data_store.create_backup(manual=True)
+        backup_file = self.data_store.create_backup(self.attendees, manual=True)
         return backup_file
+    
+    def restore_backup(self, backup_file: str = None, at: datetime.datetime = None) -> int:
+        # the store saves the restored attendees as the event; everything built from the old ones is rebuilt,
+        # later changes are journaled against self.attendees and compaction would otherwise write the old event back
+        self.attendees = self.data_store.restore_backup(backup_file, at)
+        self.email_index = self.build_email_index()
+        self.stats = EventStats(self.attendees)
+        self.search_index = SearchIndex(self.attendees)
+        self.search_index.start()
+        return len(self.attendees)
 
 
 class EventManagementPlatformCLI:
     def __init__(self):
         print("\n===== SNUCC Event Management Platform =====\n")
-        self.event_manager = EventManager(id_generator=QRCodeGenerator())
+        self.event_manager = EventManager(id_generator=QRCodeGenerator(), data_store=JournaledDataStore(snapshot_format="binary"))
         self.menu_options = {
             "1": self.import_attendees,
             "2": self.check_in_attendee,
@@ -367,6 +1297,8 @@ class EventManagementPlatformCLI:
         count, files = self.event_manager.import_attendees_from_csv(csv_file)
         print(f"Successfully imported {count} attendees.")
         print(f"ID files generated in {self.event_manager.id_output_dir}")
+        for email, error in self.event_manager.id_file_errors:
+            print(f"  Failed to generate ID file for {email}: {error}")
     
     def check_in_attendee(self):
         unique_id = input("Enter attendee unique ID: ")
@@ -432,7 +1364,11 @@ class EventManagementPlatformCLI:
         print(f"Report exported to {file_path}")
     
     def create_backup(self):
-        backup_file = self.event_manager.create_manual_backup()
+        try:
+            backup_file = self.event_manager.create_manual_backup()
+        except Exception as e:
+            print(f"Error creating backup: {e}")
+            return
         print(f"Manual backup created successfully: {backup_file}")
     
     
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_tracker import Attendee
+
+
+@pytest.fixture
+def make_attendees():
+    # make_attendees(count) -> {"uid-0": Attendee("Attendee 0", "attendee0@example.com"), ...}
+    def make(count):
+        attendees = {}
+        for i in range(count):
+            attendee = Attendee(f"Attendee {i}", f"attendee{i}@example.com", unique_id=f"uid-{i}")
+            attendees[attendee.unique_id] = attendee
+        return attendees
+    return make
@@ -0,0 +1,24 @@
+import os
+
+import pytest
+
+from event_tracker import IncrementalBackups
+
+
+def test_manual_backup_exists_when_returned(tmp_path, make_attendees):
+    backups = IncrementalBackups(str(tmp_path))
+    backup_file = backups.backup(make_attendees(2), manual=True)
+    assert os.path.exists(backup_file)
+    assert list(backups.restore(backup_file)) == ["uid-0", "uid-1"]
+
+
+def test_failed_manual_backup_raises(tmp_path, monkeypatch, make_attendees):
+    backups = IncrementalBackups(str(tmp_path))
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(backups, "write_backup", fail)
+    with pytest.raises(OSError, match="disk full"):
+        backups.backup(make_attendees(2), manual=True)
+    assert backups.pending == []
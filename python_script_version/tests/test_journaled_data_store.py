@@ -0,0 +1,174 @@
+import os
+
+import pytest
+
+from event_tracker import Attendee, DataStore, EventManager, JournaledDataStore
+
+
+def check_in(store, attendees, unique_id):
+    attendees[unique_id].check_in()
+    store.update_attendee(attendees, attendees[unique_id])
+
+
+def checked_in(attendees):
+    return sorted(uid for uid, attendee in attendees.items() if attendee.check_in_status)
+
+
+def test_replays_journal_over_snapshot(tmp_path, make_attendees):
+    store = JournaledDataStore(str(tmp_path))
+    attendees = make_attendees(5)
+    store.save_attendees(attendees)
+    check_in(store, attendees, "uid-1")
+    check_in(store, attendees, "uid-3")
+
+    loaded = JournaledDataStore(str(tmp_path)).load_attendees()
+    assert len(loaded) == 5
+    assert checked_in(loaded) == ["uid-1", "uid-3"]
+
+
+def test_torn_last_line_does_not_swallow_later_updates(tmp_path, make_attendees):
+    store = JournaledDataStore(str(tmp_path))
+    attendees = make_attendees(5)
+    store.save_attendees(attendees)
+    check_in(store, attendees, "uid-0")
+    # crash halfway through appending the next record
+    with open(store.journal_file, "a") as f:
+        f.write('{"uid": "uid-1", "attendee": {"na')
+
+    store = JournaledDataStore(str(tmp_path))
+    attendees = store.load_attendees()
+    assert checked_in(attendees) == ["uid-0"]
+    for uid in ("uid-2", "uid-3", "uid-4"):
+        check_in(store, attendees, uid)
+
+    loaded = JournaledDataStore(str(tmp_path)).load_attendees()
+    assert checked_in(loaded) == ["uid-0", "uid-2", "uid-3", "uid-4"]
+
+
+def test_record_missing_its_newline_is_dropped(tmp_path, make_attendees):
+    store = JournaledDataStore(str(tmp_path))
+    attendees = make_attendees(3)
+    store.save_attendees(attendees)
+    check_in(store, attendees, "uid-0")
+    with open(store.journal_file, "rb+") as f:
+        f.truncate(os.path.getsize(store.journal_file) - 1)
+
+    store = JournaledDataStore(str(tmp_path))
+    attendees = store.load_attendees()
+    check_in(store, attendees, "uid-2")
+
+    loaded = JournaledDataStore(str(tmp_path)).load_attendees()
+    assert checked_in(loaded) == ["uid-2"]
+
+
+def test_compaction_folds_journal_into_snapshot(tmp_path, make_attendees):
+    store = JournaledDataStore(str(tmp_path), compact_threshold=1)
+    attendees = make_attendees(4)
+    store.save_attendees(attendees)
+    check_in(store, attendees, "uid-0")
+    store.wait_for_compaction()
+    assert not os.path.exists(store.journal_file)
+    assert not os.path.exists(store.compacting_file)
+
+    check_in(store, attendees, "uid-2")
+    store.wait_for_compaction()
+
+    loaded = JournaledDataStore(str(tmp_path)).load_attendees()
+    assert checked_in(loaded) == ["uid-0", "uid-2"]
+
+
+def test_leftover_compacting_journal_is_replayed(tmp_path, make_attendees):
+    store = JournaledDataStore(str(tmp_path))
+    attendees = make_attendees(3)
+    store.save_attendees(attendees)
+    check_in(store, attendees, "uid-0")
+    # crash after the journal was rotated but before the snapshot was rewritten
+    os.replace(store.journal_file, store.compacting_file)
+    check_in(store, attendees, "uid-1")
+
+    loaded = JournaledDataStore(str(tmp_path)).load_attendees()
+    assert checked_in(loaded) == ["uid-0", "uid-1"]
+
+
+def test_binary_snapshot_round_trip(tmp_path, make_attendees):
+    store = JournaledDataStore(str(tmp_path), snapshot_format="binary")
+    attendees = make_attendees(3)
+    store.save_attendees(attendees)
+    check_in(store, attendees, "uid-2")
+
+    loaded = dict(JournaledDataStore(str(tmp_path), snapshot_format="binary").load_attendees())
+    assert sorted(loaded) == ["uid-0", "uid-1", "uid-2"]
+    assert checked_in(loaded) == ["uid-2"]
+
+
+def test_binary_snapshot_keeps_separator_characters(tmp_path):
+    store = JournaledDataStore(str(tmp_path), snapshot_format="binary")
+    attendee = Attendee("Bad\x1fName", "odd\x1f@example.com", "\x1f\x1f", "Speaker", unique_id="uid-0")
+    attendee.check_in()
+    attendee.collect_lunch("2025-01-01")
+    attendee.collect_lunch("2025\x1f01-02")
+    store.save_attendees({attendee.unique_id: attendee})
+
+    loaded = JournaledDataStore(str(tmp_path), snapshot_format="binary").load_attendees()["uid-0"]
+    assert loaded.to_dict() == dict(attendee.to_dict(), registration_time=str(attendee.registration_time))
+
+
+def test_json_event_is_converted_once_and_moved_aside(tmp_path, make_attendees):
+    DataStore(str(tmp_path)).save_attendees(make_attendees(3))
+    store = JournaledDataStore(str(tmp_path), snapshot_format="binary")
+    attendees = store.load_attendees()
+    check_in(store, attendees, "uid-2")
+
+    assert os.path.exists(os.path.join(str(tmp_path), "attendees.json.migrated"))
+    assert checked_in(JournaledDataStore(str(tmp_path), snapshot_format="binary").load_attendees()) == ["uid-2"]
+    with pytest.raises(ValueError):
+        DataStore(str(tmp_path)).load_attendees()
+
+
+def test_event_opens_from_saved_indexes_without_decoding(tmp_path, make_attendees):
+    store = JournaledDataStore(str(tmp_path))
+    attendees = make_attendees(5)
+    attendees["uid-3"].role = "Speaker"
+    store.save_attendees(attendees)
+    check_in(store, attendees, "uid-1")
+    attendees["uid-1"].collect_lunch("2025-01-01")
+    store.update_attendee(attendees, attendees["uid-1"])
+
+    store = JournaledDataStore(str(tmp_path))
+    loaded = store.load_attendees()
+    assert store.load_indexes() is not None
+    # only the journaled attendee was decoded, to move it over in the saved counters
+    assert loaded.pending == 4
+
+    manager = EventManager(data_store=JournaledDataStore(str(tmp_path)), debug_stats=True)
+    assert manager.find_by_email(" Attendee3@Example.com").unique_id == "uid-3"
+    stats = manager.get_stats()
+    assert stats["checked_in"] == 1
+    assert stats["lunch_by_date"] == {"2025-01-01": 1}
+    assert stats["role_counts"] == {"Attendee": 4, "Speaker": 1}
+
+
+def test_restored_backup_stays_restored_after_later_changes(tmp_path, make_attendees):
+    store = JournaledDataStore(str(tmp_path), compact_threshold=1)
+    store.save_attendees(make_attendees(3))
+    manager = EventManager(data_store=store, debug_stats=True)
+    manager.check_in_attendee("uid-0")
+    store.wait_for_compaction()
+    backup_file = manager.create_manual_backup()
+
+    manager.check_in_attendee("uid-1")
+    manager.add_attendee(Attendee("Late", "late@example.com", unique_id="uid-late"))
+    store.save_attendees(manager.attendees)
+
+    assert manager.restore_backup(backup_file) == 3
+    assert manager.find_by_email("late@example.com") is None
+    assert manager.search_attendees("late") == []
+    assert manager.get_stats()["checked_in"] == 1
+
+    # journaled and compacted against the restored attendees, not the ones from before the restore
+    manager.check_in_attendee("uid-2")
+    store.wait_for_compaction()
+
+    loaded = JournaledDataStore(str(tmp_path)).load_attendees()
+    assert list(loaded) == ["uid-0", "uid-1", "uid-2"]
+    assert checked_in(loaded) == ["uid-0", "uid-2"]
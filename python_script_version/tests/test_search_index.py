@@ -0,0 +1,43 @@
+from event_tracker import Attendee, SearchIndex
+
+
+def sample_attendees():
+    attendees = {}
+    for i, (name, role) in enumerate([("Ada Lovelace", "Speaker"), ("Alan Turing", "Attendee"), ("Grace Hopper", "Speaker")]):
+        attendee = Attendee(name, f"{name.split()[0].lower()}@example.com", f"555-010{i}", role, unique_id=f"7f3a-{i}")
+        attendees[attendee.unique_id] = attendee
+    return attendees
+
+
+QUERIES = ["ada", "SPEAK", "example", "555-0101", "an", "7f3a", "7F3A-2", "3a-1", "nobody", ""]
+
+
+def test_index_matches_the_scan_it_replaces():
+    attendees = sample_attendees()
+    index = SearchIndex(attendees)
+    scanned = {query: index.search(query) for query in QUERIES}
+    index.start()
+    index.wait()
+
+    for query in QUERIES:
+        assert index.search(query) == scanned[query], query
+    assert index.search("speak") == ["7f3a-0", "7f3a-2"]
+    # unique_ids match by prefix only
+    assert index.search("7f3a-2") == ["7f3a-2"]
+    assert index.search("3a-1") == []
+
+
+def test_attendees_added_before_and_after_the_build_are_found():
+    attendees = sample_attendees()
+    index = SearchIndex(attendees)
+    early = Attendee("Katherine Johnson", "kj@example.com", unique_id="b-early")
+    attendees[early.unique_id] = early
+    index.add(early)
+    index.start()
+    index.wait()
+    late = Attendee("Katherine Late", "late@example.com", unique_id="a-late")
+    attendees[late.unique_id] = late
+    index.add(late)
+
+    assert index.search("katherine") == ["b-early", "a-late"]
+    assert index.search("a-l") == ["a-late"]
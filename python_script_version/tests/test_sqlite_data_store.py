@@ -0,0 +1,67 @@
+import os
+
+from event_tracker import Attendee, DataStore, JournaledDataStore, SQLiteDataStore
+
+
+def test_update_attendee_round_trip(tmp_path, make_attendees):
+    store = SQLiteDataStore(str(tmp_path))
+    attendees = make_attendees(3)
+    store.save_attendees(attendees)
+    attendees["uid-1"].check_in()
+    attendees["uid-1"].collect_lunch("2025-05-11")
+    store.update_attendee(attendees, attendees["uid-1"])
+
+    loaded = SQLiteDataStore(str(tmp_path)).load_attendees()
+    assert list(loaded) == ["uid-0", "uid-1", "uid-2"]
+    assert loaded["uid-1"].check_in_status
+    assert loaded["uid-1"].lunch_collected == {"2025-05-11"}
+
+
+def test_save_attendees_replaces_everything(tmp_path, make_attendees):
+    store = SQLiteDataStore(str(tmp_path))
+    attendees = make_attendees(3)
+    attendees["uid-0"].collect_lunch("2025-05-11")
+    store.save_attendees(attendees)
+
+    del attendees["uid-2"]
+    attendees["uid-0"].lunch_collected = []
+    store.save_attendees(attendees)
+
+    loaded = SQLiteDataStore(str(tmp_path)).load_attendees()
+    assert list(loaded) == ["uid-0", "uid-1"]
+    assert loaded["uid-0"].lunch_collected == set()
+
+
+def test_restore_backup_drops_later_changes(tmp_path, make_attendees):
+    store = SQLiteDataStore(str(tmp_path))
+    attendees = make_attendees(3)
+    store.save_attendees(attendees)
+    backup_file = store.create_backup(attendees, manual=True)
+    store.backups.wait()
+
+    attendees["uid-0"].check_in()
+    attendees["uid-0"].collect_lunch("2025-05-11")
+    store.update_attendee(attendees, attendees["uid-0"])
+    late = Attendee("Late", "late@example.com", unique_id="uid-late")
+    attendees[late.unique_id] = late
+    store.save_attendees(attendees)
+
+    store.restore_backup(backup_file)
+
+    loaded = SQLiteDataStore(str(tmp_path)).load_attendees()
+    assert list(loaded) == ["uid-0", "uid-1", "uid-2"]
+    assert not loaded["uid-0"].check_in_status
+    assert loaded["uid-0"].lunch_collected == set()
+
+
+def test_migrates_the_journaled_binary_event(tmp_path, make_attendees):
+    DataStore(str(tmp_path)).save_attendees(make_attendees(3))
+    journaled = JournaledDataStore(str(tmp_path), snapshot_format="binary")
+    attendees = journaled.load_attendees()
+    attendees["uid-1"].check_in()
+    journaled.update_attendee(attendees, attendees["uid-1"])
+    assert not os.path.exists(os.path.join(str(tmp_path), "attendees.json"))
+
+    loaded = SQLiteDataStore(str(tmp_path)).load_attendees()
+    assert list(loaded) == ["uid-0", "uid-1", "uid-2"]
+    assert [uid for uid, attendee in loaded.items() if attendee.check_in_status] == ["uid-1"]